@@ -13,6 +13,7 @@ from app.models.scanlog_model import ScanLog
 from app.models.nutrition_model import Nutrition
 from app.models.notification_model import Notification
 from app.models.user_product import UserProduct
+from app.models.daily_stats_model import DailyInventoryStat
 import urllib.parse
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,157 @@
+"""add product normalized name
+
+Revision ID: 5d90b3e6a1c4
+Revises: c7d25e9a4f38
+Create Date: 2026-10-19 13:12:48.205913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5d90b3e6a1c4"
+down_revision: Union[str, Sequence[str], None] = "c7d25e9a4f38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+products = sa.table(
+    "products",
+    sa.column("id", sa.String),
+    sa.column("name", sa.String),
+    sa.column("normalizedName", sa.String),
+    sa.column("nutritionId", sa.String),
+    sa.column("addedAt", sa.String),
+)
+nutritions = sa.table("nutritions", sa.column("id", sa.String))
+user_products = sa.table(
+    "userProducts",
+    sa.column("id", sa.String),
+    sa.column("userId", sa.String),
+    sa.column("productId", sa.String),
+    sa.column("quantity", sa.Integer),
+    sa.column("expiryDate", sa.String),
+)
+scanlogs = sa.table("scanlogs", sa.column("productId", sa.String))
+
+
+def normalize(name: str) -> str:
+    # Kept in sync with app.utils.product_utils.normalize_product_name
+    return " ".join(name.split()).lower()
+
+
+def merge_user_products(conn, product_id: str, keeper_id: str):
+    """
+    Move a duplicate's userProducts to the keeper. A user holding both keeps a
+    single row: quantities are added up and the earlier expiry date wins.
+    """
+    keeper_rows = {
+        user_id: (row_id, quantity, expiry_date)
+        for row_id, user_id, quantity, expiry_date in conn.execute(
+            sa.select(
+                user_products.c.id,
+                user_products.c.userId,
+                user_products.c.quantity,
+                user_products.c.expiryDate,
+            ).where(user_products.c.productId == keeper_id)
+        )
+    }
+    duplicate_rows = conn.execute(
+        sa.select(
+            user_products.c.id,
+            user_products.c.userId,
+            user_products.c.quantity,
+            user_products.c.expiryDate,
+        ).where(user_products.c.productId == product_id)
+    ).all()
+
+    for row_id, user_id, quantity, expiry_date in duplicate_rows:
+        kept = keeper_rows.get(user_id)
+        if kept is None:
+            conn.execute(
+                user_products.update()
+                .where(user_products.c.id == row_id)
+                .values(productId=keeper_id)
+            )
+            keeper_rows[user_id] = (row_id, quantity, expiry_date)
+            continue
+
+        kept_id, kept_quantity, kept_expiry = kept
+        merged = (kept_id, kept_quantity + quantity, min(kept_expiry, expiry_date))
+        conn.execute(
+            user_products.update()
+            .where(user_products.c.id == kept_id)
+            .values(quantity=merged[1], expiryDate=merged[2])
+        )
+        conn.execute(user_products.delete().where(user_products.c.id == row_id))
+        keeper_rows[user_id] = merged
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products", sa.Column("normalizedName", sa.String(length=255), nullable=True)
+    )
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(products.c.id, products.c.name, products.c.nutritionId).order_by(
+            products.c.addedAt, products.c.id
+        )
+    ).all()
+
+    # The oldest row of each normalized name is kept; later duplicates have
+    # their references merged into it and are removed, along with their
+    # nutrition rows unless the keeper has none and adopts it.
+    keepers = {}  # normalized name -> [product id, nutrition id]
+    for product_id, name, nutrition_id in rows:
+        normalized = normalize(name)
+        keeper = keepers.get(normalized)
+        if keeper is None:
+            keepers[normalized] = [product_id, nutrition_id]
+            conn.execute(
+                products.update()
+                .where(products.c.id == product_id)
+                .values(normalizedName=normalized)
+            )
+            continue
+
+        keeper_id, keeper_nutrition_id = keeper
+        merge_user_products(conn, product_id, keeper_id)
+        conn.execute(
+            scanlogs.update()
+            .where(scanlogs.c.productId == product_id)
+            .values(productId=keeper_id)
+        )
+        conn.execute(products.delete().where(products.c.id == product_id))
+
+        if nutrition_id is None or nutrition_id == keeper_nutrition_id:
+            continue
+        if keeper_nutrition_id is None:
+            conn.execute(
+                products.update()
+                .where(products.c.id == keeper_id)
+                .values(nutritionId=nutrition_id)
+            )
+            keeper[1] = nutrition_id
+        else:
+            conn.execute(nutritions.delete().where(nutritions.c.id == nutrition_id))
+
+    op.alter_column(
+        "products",
+        "normalizedName",
+        existing_type=sa.String(length=255),
+        nullable=False,
+    )
+    op.create_index(
+        "ux_products_normalized_name", "products", ["normalizedName"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ux_products_normalized_name", table_name="products")
+    op.drop_column("products", "normalizedName")
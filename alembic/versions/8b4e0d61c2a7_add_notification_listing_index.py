@@ -0,0 +1,33 @@
+"""add notification listing index
+
+Revision ID: 8b4e0d61c2a7
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-19 10:03:27.540916
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e0d61c2a7"
+down_revision: Union[str, Sequence[str], None] = "3f1a9c2d7b10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_notifications_user_created",
+        "notifications",
+        ["userId", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notifications_user_created", table_name="notifications")
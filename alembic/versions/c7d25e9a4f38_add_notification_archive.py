@@ -0,0 +1,59 @@
+"""add notification archive
+
+Revision ID: c7d25e9a4f38
+Revises: 8b4e0d61c2a7
+Create Date: 2026-10-19 11:26:05.772410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d25e9a4f38"
+down_revision: Union[str, Sequence[str], None] = "8b4e0d61c2a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "notifications_archive",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("userId", sa.String(length=36), nullable=False),
+        sa.Column("productName", sa.String(length=255), nullable=False),
+        sa.Column("message", sa.String(length=255), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum("info", "warning", "error", name="notificationtype"),
+            nullable=False,
+        ),
+        sa.Column("read", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.String(length=255), nullable=False),
+        sa.Column("archived_at", sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_notifications_archive_userId"),
+        "notifications_archive",
+        ["userId"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_notifications_read_created",
+        "notifications",
+        ["read", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notifications_read_created", table_name="notifications")
+    op.drop_index(
+        op.f("ix_notifications_archive_userId"), table_name="notifications_archive"
+    )
+    op.drop_table("notifications_archive")
@@ -0,0 +1,58 @@
+"""add daily inventory stats
+
+Revision ID: e41c8a7f2b95
+Revises: 5d90b3e6a1c4
+Create Date: 2026-10-19 15:04:31.918274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e41c8a7f2b95"
+down_revision: Union[str, Sequence[str], None] = "5d90b3e6a1c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_inventory_stats",
+        sa.Column("statDate", sa.Date(), nullable=False),
+        sa.Column("userId", sa.String(length=36), nullable=False),
+        sa.Column("category", sa.String(length=255), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("expired", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("statDate", "userId", "category"),
+    )
+    op.create_index(
+        "ix_daily_inventory_stats_user_date",
+        "daily_inventory_stats",
+        ["userId", "statDate"],
+        unique=False,
+    )
+    # Same aggregate as daily_stats_service.rebuild_daily_stats, which can be
+    # re-run later with `python -m scripts.rebuild_daily_stats`
+    op.execute(
+        """
+        INSERT INTO daily_inventory_stats (statDate, userId, category, total, expired)
+        SELECT CAST(up.expiryDate AS DATE), up.userId, p.category, COUNT(*),
+               SUM(CASE WHEN up.status = 'expired' THEN 1 ELSE 0 END)
+        FROM userProducts up
+        JOIN products p ON p.id = up.productId
+        WHERE CAST(up.expiryDate AS DATE) IS NOT NULL
+        GROUP BY CAST(up.expiryDate AS DATE), up.userId, p.category
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_daily_inventory_stats_user_date", table_name="daily_inventory_stats"
+    )
+    op.drop_table("daily_inventory_stats")
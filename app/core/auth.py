@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from app.utils.jwt import decode_access_token
+
+load_dotenv()
+
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# Upper bound on how long verified claims are reused, even if exp is later
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+
+# The app is served under this prefix (FastAPI root_path)
+ROOT_PATH = "/api"
+
+PUBLIC_PATHS = frozenset(
+    {
+        f"{ROOT_PATH}/auth/login",
+        f"{ROOT_PATH}/auth/signup",
+        f"{ROOT_PATH}/status",
+        f"{ROOT_PATH}/yolo/ready",
+        "/docs",
+        "/redoc",
+        f"{ROOT_PATH}/openapi.json",
+    }
+)
+
+
+class TokenClaimsCache:
+    """
+    LRU of verified JWT claims keyed by the SHA-256 of the token. An entry
+    lives until the token's exp or ttl_seconds, whichever comes first, so a
+    cached token is never accepted past its expiry. Only valid tokens are
+    cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = AUTH_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = AUTH_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # digest -> (expires_at, claims)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def decode(self, token: str):
+        """Verified claims for a token, or None if it is invalid or expired."""
+        digest = hashlib.sha256(token.encode()).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(digest)
+                self.stats["hits"] += 1
+                return dict(entry[1])
+            self.stats["misses"] += 1
+
+        claims = decode_access_token(token)
+        if not claims:
+            return None
+
+        expires_at = now + self.ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        with self._lock:
+            self._entries[digest] = (expires_at, claims)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dict(claims)
+
+    def get_stats(self):
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            **self.stats,
+        }
+
+
+token_claims_cache = TokenClaimsCache()
+
+
+def _request_path(scope) -> str:
+    # Match request.url.path: depending on the Starlette version scope["path"]
+    # may or may not already include the root_path
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and not path.startswith(root_path):
+        path = root_path + path
+    return path
+
+
+class AccessTokenMiddleware:
+    """
+    Pure ASGI replacement for the @app.middleware("http") token check: no
+    BaseHTTPMiddleware task/stream wrapping, a set lookup for public paths and
+    cached signature verification. Verified claims end up in request.state.user.
+    Paths under public_prefixes (e.g. a static file mount) are public as well.
+    """
+
+    def __init__(
+        self,
+        app,
+        public_paths=PUBLIC_PATHS,
+        public_prefixes=(),
+        cache=token_claims_cache,
+    ):
+        self.app = app
+        self.public_paths = frozenset(public_paths)
+        self.public_prefixes = tuple(public_prefixes)
+        self.cache = cache
+
+    def _is_public(self, path: str) -> bool:
+        return path in self.public_paths or (
+            bool(self.public_prefixes) and path.startswith(self.public_prefixes)
+        )
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            # Skip access token check for preflight requests and public paths
+            or scope["method"] == "OPTIONS"
+            or self._is_public(_request_path(scope))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+        if not auth_header:
+            await self._reject(send, "Authorization header missing or invalid.")
+            return
+
+        access_token = auth_header.split("Bearer ")[-1].strip()
+        if not access_token:
+            await self._reject(send, "Access token is missing or invalid.")
+            return
+
+        payload = self.cache.decode(access_token)
+        if payload is None:
+            await self._reject(send, "Access token is invalid.")
+            return
+
+        # Backs request.state, so handlers keep reading request.state.user
+        scope.setdefault("state", {})["user"] = payload
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send, detail: str):
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
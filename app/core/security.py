@@ -0,0 +1,91 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from dotenv import load_dotenv
+
+from app.services.admission_control import AdmissionController
+
+load_dotenv()
+
+# bcrypt work factor for new hashes; existing hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# bcrypt releases the GIL, so a couple of dedicated threads keep logins off
+# the AnyIO threadpool the sync endpoints share
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+
+password_hash_admission = AdmissionController(
+    "password-hash",
+    max_in_flight=PASSWORD_HASH_WORKERS,
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64")),
+    queue_timeout_ms=float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT_MS", "5000")),
+    retry_after_seconds=int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "1")),
+)
+
+password_hash_stats = {
+    operation: {"count": 0, "totalMs": 0.0, "maxMs": 0.0}
+    for operation in ("hash", "verify")
+}
+
+
+async def _run_timed(operation: str, func, *args):
+    async with password_hash_admission.slot():
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(_executor, func, *args)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats = password_hash_stats[operation]
+            stats["count"] += 1
+            stats["totalMs"] += elapsed
+            stats["maxMs"] = max(stats["maxMs"], elapsed)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode(
+        "utf-8"
+    )
+
+
+def _verify(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+async def hash_password(password: str) -> str:
+    return await _run_timed("hash", _hash, password, BCRYPT_ROUNDS)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run_timed("verify", _verify, password, hashed)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True if a stored hash ($2b$<cost>$...) wasn't made with BCRYPT_ROUNDS."""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def get_password_hash_stats():
+    return {
+        "rounds": BCRYPT_ROUNDS,
+        "workers": PASSWORD_HASH_WORKERS,
+        "admission": password_hash_admission.get_stats(),
+        **{
+            operation: {
+                **stats,
+                "avgMs": (
+                    round(stats["totalMs"] / stats["count"], 2) if stats["count"] else 0
+                ),
+            }
+            for operation, stats in password_hash_stats.items()
+        },
+    }
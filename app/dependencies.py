@@ -1 +1,51 @@
 # Dependency injection functions go here
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Query, Request
+
+from app.utils.errors import AuthError
+
+load_dotenv()
+
+# Comma-separated emails allowed to read cross-user (global) statistics
+ADMIN_EMAILS = frozenset(
+    email.strip().lower()
+    for email in os.getenv("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+)
+
+
+def is_admin(claims: dict) -> bool:
+    return (claims.get("email") or "").lower() in ADMIN_EMAILS
+
+
+class StatsScope:
+    """Whose data a stats query covers: one user, or everyone (is_global)."""
+
+    def __init__(self, user_id: Optional[str] = None, is_global: bool = False):
+        self.user_id = user_id
+        self.is_global = is_global
+
+
+def get_stats_scope(
+    request: Request,
+    scope: str = Query(
+        "user",
+        pattern="^(user|global)$",
+        description="'user' for the caller's own data, 'global' (admins only) for all users",
+    ),
+) -> StatsScope:
+    claims = request.state.user
+    user_id = claims.get("userId")
+    # A token without a userId must never fall through to unscoped stats
+    if not user_id:
+        raise AuthError(detail="Token is missing the user id")
+    if scope == "global":
+        if not is_admin(claims):
+            raise HTTPException(
+                status_code=403, detail="Global statistics are restricted to admins."
+            )
+        return StatsScope(is_global=True)
+    return StatsScope(user_id=user_id)
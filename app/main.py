@@ -1,15 +1,13 @@
+import asyncio
 import os
-import shutil
-from fastapi import FastAPI, Request, WebSocket, Query, UploadFile, File
+from fastapi import FastAPI, Request, WebSocket, Query
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import request_validation_exception_handler
-from app.utils.jwt import decode_access_token
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
-from datetime import datetime
-
-
+from app.core.auth import ROOT_PATH, AccessTokenMiddleware
 from app.routers.auth import router as auth_router
 from app.routers.product import router as product_router
 from app.routers.user_inventory import router as user_inventory_router
@@ -17,18 +15,26 @@ from app.routers.user import router as user_router
 from app.routers.notification_router import router as notification_router
 from app.routers.detection import router as detection_router
 from app.routers.stats import router as stats_router
+from app.routers.scan import router as scan_router
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 import json
 from app.services.notification_service import notification_websocket
+from app.services.detection_stream_service import detection_websocket
 from app.services.product_service import check_product_expiry, add_product_to_inventory
+from app.services.notification_retention_service import archive_read_notifications
+from app.services.detection_pool import start_detection_pool, shutdown_detection_pool
+from app.services.barcode_index import barcode_index
+from app.services.catalog_matcher import catalog_matcher
+from app.services.image_storage import (
+    IMAGE_STORAGE_BACKEND,
+    LOCAL_STORAGE_DIR,
+    LOCAL_STORAGE_BASE_URL,
+    LOCAL_STORAGE_PUBLIC_PREFIX,
+)
 
-import shutil
-import numpy as np
-import cv2
-
-app = FastAPI(root_path="/api", root_path_in_servers="/api")
+app = FastAPI(root_path=ROOT_PATH, root_path_in_servers=ROOT_PATH)
 scheduler = AsyncIOScheduler()
 
 origins = [
@@ -48,52 +54,14 @@ app.add_middleware(
 )
 
 
-@app.middleware("http")
-async def access_token_middleware(request: Request, call_next):
-
-    # Skip access token check for preflight requests
-    if request.method == "OPTIONS":
-        return await call_next(request)
-
-    public_paths = [
-        "/api/auth/login",
-        "/api/auth/signup",
-        "/api/status",
-        "/docs",
-        "/redoc",
-        "/api/openapi.json",
-    ]
-
-    # Skip access token check for public paths
-    if request.url.path in public_paths:
-        return await call_next(request)
-
-    # access_token = request.cookies.get("access_token")
-    auth_header = request.headers.get("Authorization")
-    if not auth_header:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Authorization header missing or invalid."},
-        )
-    access_token = auth_header.split("Bearer ")[-1].strip()
-
-    if not access_token:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Access token is missing or invalid."},
-        )
-    try:
-        payload = decode_access_token(access_token)
-        request.state.user = payload  # Store user info in request state
-
-    except Exception as e:
-        return JSONResponse(
-            status_code=401,
-            content={"detail": "Access token is invalid."},
-        )
-
-    response = await call_next(request)
-    return response
+# Added after CORS so it stays the outermost middleware, as before
+app.add_middleware(
+    AccessTokenMiddleware,
+    # The local annotated-image mount is loaded straight from <img> tags
+    public_prefixes=(
+        (LOCAL_STORAGE_PUBLIC_PREFIX,) if IMAGE_STORAGE_BACKEND == "local" else ()
+    ),
+)
 
 
 @app.exception_handler(RequestValidationError)
@@ -120,45 +88,6 @@ def status():
     return {"status": "OK", "message": "Server Is Running"}
 
 
-@app.post("/qr", tags=["QR Code"])
-async def decode_qr_code(request: Request, file: UploadFile = File(...)):
-    access_token = request.state.user
-    user_id = access_token.get("userId")
-
-    image_bytes = await file.read()
-    np_arr = np.frombuffer(image_bytes, np.uint8)
-
-    print("Numpy array shape:", np_arr.shape)
-    # Decode image using OpenCV
-    img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-    filename = (
-        str(file.filename)
-        if file.filename
-        else f"qr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
-    )
-    file_path = os.path.join("uploads", filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Initialize QRCode detector
-    detector = cv2.QRCodeDetector()
-
-    # Detect and decode
-    data, bbox, _ = detector.detectAndDecode(img)
-
-    if bbox is not None and data:
-        # await add_product_to_inventory(
-        #     user_id=user_id,
-        #     product={"productName": data, "category": "Uncategorized"},
-        #     db=next(get_db()),
-        # )
-        return {"message": "QR Scanned successfully", "data": data}
-    else:
-        return {"error": "No QR code found in the image"}
-
-
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(product_router, prefix="/product", tags=["Product Inventory"])
 app.include_router(user_inventory_router, prefix="/product", tags=["User Inventory"])
@@ -166,18 +95,40 @@ app.include_router(user_router, prefix="/user", tags=["User Profile"])
 app.include_router(notification_router, prefix="/notification", tags=["Notifications"])
 app.include_router(detection_router, prefix="/yolo", tags=["YOLO Detection"])
 app.include_router(stats_router, prefix="/stats", tags=["Statistics"])
+app.include_router(scan_router, tags=["QR Code"])
+
+if IMAGE_STORAGE_BACKEND == "local":
+    os.makedirs(LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(
+        LOCAL_STORAGE_BASE_URL,
+        StaticFiles(directory=LOCAL_STORAGE_DIR),
+        name="annotated-images",
+    )
 
 
 @app.on_event("startup")
 async def startup_event():
     scheduler.add_job(check_product_expiry, CronTrigger(second="*/10"))
+    scheduler.add_job(
+        archive_read_notifications,
+        CronTrigger.from_crontab(os.getenv("NOTIFICATION_RETENTION_CRON", "30 3 * * *")),
+        max_instances=1,
+        coalesce=True,
+    )
     scheduler.start()
     print("Scheduler started")
+    # Both load in background threads; scans fall back to the database and
+    # catalog matching to the shelf-life names meanwhile
+    barcode_index.refresh()
+    catalog_matcher.refresh()
+    # Keep a reference so the warm-up task isn't garbage collected
+    app.state.detection_pool_start = asyncio.create_task(start_detection_pool())
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     scheduler.shutdown()
+    await shutdown_detection_pool()
 
 
 # @app.websocket("/ws")
@@ -195,6 +146,15 @@ async def shutdown_event():
 
 @app.websocket("/ws/notification")
 async def websocket_notification_endpoint(
+    websocket: WebSocket,
+    access_token: str = Query(None),
+    page_size: int = Query(None, ge=0, description="Unread replay page size"),
+):
+    await notification_websocket(websocket, access_token, page_size)
+
+
+@app.websocket("/ws/detect")
+async def websocket_detection_endpoint(
     websocket: WebSocket, access_token: str = Query(None)
 ):
-    await notification_websocket(websocket, access_token)
+    await detection_websocket(websocket, access_token)
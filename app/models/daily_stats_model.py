@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, Index, Integer, String
+from app.models.base import Base
+
+
+class DailyInventoryStat(Base):
+    """
+    Per day (by expiry date), user and product category: how many user products
+    expire that day and how many of those have expired. Maintained by
+    daily_stats_service alongside the writes to userProducts.
+    """
+
+    __tablename__ = "daily_inventory_stats"
+
+    statDate = Column(Date, primary_key=True)
+    userId = Column(String(36), primary_key=True)
+    category = Column(String(255), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    expired = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Per-user dashboards: WHERE userId = ? ... GROUP BY statDate
+        Index("ix_daily_inventory_stats_user_date", "userId", "statDate"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from app.models.base import Base
 import enum
@@ -22,3 +22,28 @@ class Notification(Base):
     type = Column(Enum(NotificationType), nullable=False)
     read = Column(Boolean, default=False, nullable=True)
     created_at = Column(String(255), nullable=False)
+
+    __table_args__ = (
+        # Serves the unread replay on WebSocket connect and the unread count:
+        # WHERE userId = ? AND read = false ORDER BY created_at
+        Index("ix_notifications_user_read_created", "userId", "read", "created_at"),
+        # Serves the keyset-paginated /notification/list (newest first)
+        Index("ix_notifications_user_created", "userId", "created_at"),
+        # Serves the retention job: WHERE read = true AND created_at < cutoff
+        Index("ix_notifications_read_created", "read", "created_at"),
+    )
+
+
+class NotificationArchive(Base):
+    """Read notifications moved out of the hot table by the retention job."""
+
+    __tablename__ = "notifications_archive"
+
+    id = Column(String(36), primary_key=True)
+    userId = Column(String(36), nullable=False, index=True)
+    productName = Column(String(255), nullable=False)
+    message = Column(String(255), nullable=False)
+    type = Column(Enum(NotificationType), nullable=False)
+    read = Column(Boolean, default=True, nullable=True)
+    created_at = Column(String(255), nullable=False)
+    archived_at = Column(String(255), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from app.models.base import Base
 import uuid
@@ -9,8 +9,16 @@ class Product(Base):
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
+    # Lowercased, whitespace-collapsed name; see normalize_product_name
+    normalizedName = Column(String(255), nullable=False)
     category = Column(String(255), nullable=False)
     barcode = Column(String(255), nullable=False, unique=True)
     nutritionId = Column(String(36), ForeignKey("nutritions.id"), nullable=True)
     addedAt = Column(String(255), nullable=False)
     updatedAt = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        # One catalog row per name regardless of case/spacing; also serves the
+        # name -> product lookup on the add-to-inventory path
+        Index("ux_products_normalized_name", "normalizedName", unique=True),
+    )
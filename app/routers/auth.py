@@ -1,19 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.schemas.auth_schema import LoginRequest, RegisterRequest
 from app.utils.errors import AuthError
 from app.models.user_model import User
 from app.db.session import get_db
-import bcrypt
 from datetime import datetime
 from app.utils.jwt import create_access_token
+from app.core.security import (
+    get_password_hash_stats,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
 from sqlalchemy.exc import SQLAlchemyError
 
 router = APIRouter()
 
 
+def find_user_by_email(email: str, db: Session):
+    return db.query(User).filter(User.email == email).first()
+
+
+def save_user(user: User, db: Session):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+
 @router.post("/login")
-def login(data: LoginRequest, response: Response, db: Session = Depends(get_db)):
+async def login(
+    data: LoginRequest, response: Response, db: Session = Depends(get_db)
+):
     try:
         email = data.email
         password = data.password
@@ -23,14 +41,22 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
         if not password:
             raise HTTPException(detail="Password is required")
 
-        user = db.query(User).filter(User.email == email).first()
+        # Handlers are async so hashing can await its executor; the blocking
+        # queries go to the threadpool instead of running on the event loop
+        user = await run_in_threadpool(find_user_by_email, email, db)
 
         if not user:
             raise AuthError(status_code=401, detail="Invalid email or password")
 
-        if not bcrypt.checkpw(password.encode("utf-8"), user.password.encode("utf-8")):
+        if not await verify_password(password, user.password):
             raise AuthError(status_code=401, detail="Invalid email or password")
 
+        # Upgrade hashes made with a different work factor while we have the
+        # plaintext password
+        if needs_rehash(user.password):
+            user.password = await hash_password(password)
+            await run_in_threadpool(save_user, user, db)
+
         # Generate JWT token
         access_token = create_access_token(
             data={"userId": user.id, "email": user.email}
@@ -52,6 +78,8 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
             "token": access_token,
         }
 
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
@@ -60,7 +88,9 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
 
 
 @router.post("/signup")
-def signup(data: RegisterRequest, response: Response, db: Session = Depends(get_db)):
+async def signup(
+    data: RegisterRequest, response: Response, db: Session = Depends(get_db)
+):
     try:
         name = data.name
         email = data.email
@@ -68,7 +98,7 @@ def signup(data: RegisterRequest, response: Response, db: Session = Depends(get_
         dob = data.dob
 
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == email).first()
+        existing_user = await run_in_threadpool(find_user_by_email, email, db)
 
         if existing_user:
             raise HTTPException(status_code=409, detail="User already exists")
@@ -90,18 +120,13 @@ def signup(data: RegisterRequest, response: Response, db: Session = Depends(get_
         new_user = User(
             name=name,
             email=email,
-            password=bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode(
-                "utf-8"
-            ),
+            password=await hash_password(password),
             # password = password,
             dob=dob,
             created_at=datetime.utcnow().isoformat(),
         )
         # Add user to the database
-        db.add(new_user)
-        # Commit the transaction
-        db.commit()
-        db.refresh(new_user)
+        await run_in_threadpool(save_user, new_user, db)
 
         access_token = create_access_token(
             data={"userId": new_user.id, "email": new_user.email}
@@ -121,8 +146,15 @@ def signup(data: RegisterRequest, response: Response, db: Session = Depends(get_
             "dob": new_user.dob,
             "created_at": new_user.created_at,
         }
+    except HTTPException:
+        raise
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
         print("Signup error:", e)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hash-stats")
+async def password_hashing_stats():
+    return get_password_hash_stats()
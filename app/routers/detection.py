@@ -1,30 +1,176 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
-import shutil
-import os
-from app.services.yolo_service import detect_objects
-from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List
+from app.services.detection_pool import (
+    YOLO_MAX_UPLOAD_BYTES,
+    get_pool_stats,
+    get_readiness,
+    run_detection,
+    validate_image_upload,
+)
+from app.services.detection_cache import detection_cache
+from app.services.admission_control import detection_admission
+from app.services.annotation_service import attach_annotation, get_annotation
+from app.services.catalog_matcher import attach_catalog_matches
+from app.utils.errors import PayloadTooLargeError
+from dotenv import load_dotenv
+import asyncio
+import json
 import logging
+import os
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+YOLO_MAX_BATCH_FILES = int(os.getenv("YOLO_MAX_BATCH_FILES", "32"))
+# Total upload size of one batch request; every file is held in memory at once
+YOLO_MAX_BATCH_BYTES = int(os.getenv("YOLO_MAX_BATCH_BYTES", str(100 * 1024 * 1024)))
 
 
 @router.post("/detect")
-async def detect_image(request: Request, file: UploadFile = File(...)):
+async def detect_image(
+    request: Request,
+    file: UploadFile = File(...),
+    annotate: bool = Query(True, description="Render and store an annotated image"),
+):
     access_token = request.state.user
     user_id = access_token.get("userId")
 
     logger.info("Received detection request from user ID: %s", user_id)
-    file_location = os.path.join(UPLOAD_FOLDER, str(file.filename))
-    with open(file_location, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    async with detection_admission.slot():
+        image_bytes = await file.read()
+        validate_image_upload(image_bytes)
+
+        try:
+            result = await run_detection(image_bytes)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
+    attach_catalog_matches(result)
+    return attach_annotation(result, user_id, image_bytes, annotate)
+
+
+async def detect_batch_item(
+    index: int, filename: str, image_bytes: bytes, user_id: str, annotate: bool
+) -> dict:
+    """Detection for one image of a batch; errors are reported, not raised."""
+    item = {"index": index, "filename": filename}
     try:
-        result = detect_objects(file_location)
+        validate_image_upload(image_bytes)
+        result = attach_catalog_matches(await run_detection(image_bytes))
+        item["result"] = attach_annotation(result, user_id, image_bytes, annotate)
+    except HTTPException as e:
+        item["error"] = e.detail
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        item["error"] = str(e)
+    return item
+
+
+@router.post("/detect-batch")
+async def detect_image_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    annotate: bool = Query(True, description="Render and store annotated images"),
+    stream: bool = Query(
+        False, description="Stream NDJSON results as each image finishes"
+    ),
+):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    if len(files) > YOLO_MAX_BATCH_FILES:
+        raise PayloadTooLargeError(
+            detail=f"At most {YOLO_MAX_BATCH_FILES} images per batch request"
+        )
+    # The multipart parser has spooled the files; refuse before reading them
+    # into memory. file.size is None on older Starlette, so the read below
+    # checks the total again.
+    for file in files:
+        if file.size is not None and file.size > YOLO_MAX_UPLOAD_BYTES:
+            raise PayloadTooLargeError(
+                detail=(
+                    f"{file.filename} exceeds the {YOLO_MAX_UPLOAD_BYTES} "
+                    "byte upload limit"
+                )
+            )
+    if sum(file.size or 0 for file in files) > YOLO_MAX_BATCH_BYTES:
+        raise PayloadTooLargeError(
+            detail=f"Batch exceeds the {YOLO_MAX_BATCH_BYTES} byte upload limit"
+        )
+
+    logger.info(
+        "Received batch detection request of %d images from user ID: %s",
+        len(files),
+        user_id,
+    )
+    # The batch is admitted as a whole, one unit per image
+    weight = await detection_admission.acquire(len(files))
+    try:
+        uploads, total_bytes = [], 0
+        for file in files:
+            image_bytes = await file.read()
+            total_bytes += len(image_bytes)
+            if total_bytes > YOLO_MAX_BATCH_BYTES:
+                raise PayloadTooLargeError(
+                    detail=f"Batch exceeds the {YOLO_MAX_BATCH_BYTES} byte upload limit"
+                )
+            uploads.append((file.filename, image_bytes))
+    except BaseException:
+        await detection_admission.release(weight)
+        raise
+
+    # Submitted together, the images are grouped by the micro-batcher into
+    # batched predict calls.
+    tasks = [
+        asyncio.create_task(
+            detect_batch_item(index, filename, image_bytes, user_id, annotate)
+        )
+        for index, (filename, image_bytes) in enumerate(uploads)
+    ]
+    detection_admission.release_when_done(weight, tasks)
+
+    if not stream:
+        return {"results": await asyncio.gather(*tasks)}
+
+    async def stream_results():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # The client went away: stop the remaining inference so the
+            # admission weight is released instead of held for nobody
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/annotation/{annotation_id}")
+async def get_annotation_status(annotation_id: str, request: Request):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    annotation = get_annotation(annotation_id, user_id)
+    if not annotation:
+        raise HTTPException(status_code=404, detail="Annotation not found")
+    return annotation
+
+
+@router.get("/pool-stats")
+async def detection_pool_stats():
+    return get_pool_stats()
+
+
+@router.get("/cache-stats")
+async def detection_cache_stats():
+    return detection_cache.get_stats()
+
 
-    return result
+@router.get("/ready")
+async def detection_ready():
+    readiness = get_readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503, content=readiness
+    )
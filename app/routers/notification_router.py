@@ -1,26 +1,36 @@
-from fastapi import FastAPI, Request, APIRouter, Depends, HTTPException
+from fastapi import FastAPI, Request, APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.notification_model import Notification
 from app.models.user_product import UserProduct
 from app.models.product_model import Product
+from app.schemas.notification_schema import BulkMarkReadRequest, MarkReadResponse
+from app.services.notification_service import (
+    count_unread_notifications,
+    get_notification_page,
+    mark_notifications_as_read,
+)
 
 router = APIRouter()
 
 
 @router.get("/list")
-def list_notifications(request: Request, db: Session = Depends(get_db)):
+def list_notifications(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100, description="Page size"),
+    cursor: str = Query(None, description="nextCursor from the previous page"),
+    db: Session = Depends(get_db),
+):
     access_token = request.state.user
     user_id = access_token.get("userId")
 
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    notifications = db.query(Notification).filter(Notification.userId == user_id).all()
+    notifications, next_cursor = get_notification_page(user_id, db, limit, cursor)
 
-    if not notifications:
+    if not notifications and not cursor:
         return {"message": "No notifications found"}
-    db.close()
     return {
         "notifications": [
             {
@@ -31,10 +41,22 @@ def list_notifications(request: Request, db: Session = Depends(get_db)):
                 "isRead": notification.read,
             }
             for notification in notifications
-        ]
+        ],
+        "nextCursor": next_cursor,
     }
 
 
+@router.get("/unread-count")
+def get_unread_count(request: Request, db: Session = Depends(get_db)):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    return {"unreadCount": count_unread_notifications(user_id, db)}
+
+
 @router.post("/mark-read/{notification_id}")
 def mark_notification_as_read(notification_id: str, db: Session = Depends(get_db)):
     notification = (
@@ -47,3 +69,36 @@ def mark_notification_as_read(notification_id: str, db: Session = Depends(get_db
     db.refresh(notification)
     db.close()
     return {"message": "Notification marked as read"}
+
+
+@router.post("/mark-read", response_model=MarkReadResponse)
+def mark_notifications_as_read_bulk(
+    body: BulkMarkReadRequest, request: Request, db: Session = Depends(get_db)
+):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    if not body.ids and not body.before:
+        raise HTTPException(
+            status_code=400, detail="Provide either ids or a before timestamp."
+        )
+
+    updated = mark_notifications_as_read(
+        user_id, db, notification_ids=body.ids, before=body.before
+    )
+    return {"message": "Notifications marked as read", "updated": updated}
+
+
+@router.post("/mark-all-read", response_model=MarkReadResponse)
+def mark_all_notifications_as_read(request: Request, db: Session = Depends(get_db)):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    updated = mark_notifications_as_read(user_id, db)
+    return {"message": "All notifications marked as read", "updated": updated}
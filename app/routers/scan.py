@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.services.admission_control import qr_admission
+from app.services.detection_pool import validate_image_upload
+from app.services.scan_service import resolve_scan, scan_codes
+
+router = APIRouter()
+
+
+@router.post("/qr")
+async def decode_qr_code(
+    request: Request,
+    file: UploadFile = File(...),
+    add: bool = Query(
+        False, description="Add the matched product to the user's inventory"
+    ),
+    db: Session = Depends(get_db),
+):
+    access_token = request.state.user
+    user_id = access_token.get("userId")
+
+    # Only the decode is CPU-bound; the product lookup runs outside the slot
+    async with qr_admission.slot():
+        image_bytes = await file.read()
+        validate_image_upload(image_bytes)
+
+        try:
+            codes = await scan_codes(image_bytes)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await resolve_scan(user_id, codes, add, db)
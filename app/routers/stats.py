@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import func, cast, Date, case
+from sqlalchemy import func
 from app.db.session import get_db
-from app.models.user_product import UserProduct, UserProductStatus
+from app.dependencies import StatsScope, get_stats_scope
 from app.models.nutrition_model import Nutrition
 from app.models.product_model import Product
+from app.models.daily_stats_model import DailyInventoryStat
 from app.schemas.stats_schema import (
     ExpiryTrendItem,
     WastageCategoryItem,
@@ -17,44 +18,72 @@ import random
 
 router = APIRouter()
 
+# The dashboard endpoints read daily_inventory_stats, a few rows per day and
+# category kept current by daily_stats_service, instead of grouping over the
+# whole userProducts table on every call. They are scoped to the caller unless
+# an admin asks for ?scope=global.
+
+
+def scoped(query, scope: StatsScope):
+    if scope.is_global:
+        return query
+    # Served by ix_daily_inventory_stats_user_date
+    return query.filter(DailyInventoryStat.userId == scope.user_id)
+
+
 @router.get("/expired-products", response_model=List[ExpiredProductItem])
-def get_expired_trend(db: Session = Depends(get_db)):
+def get_expired_trend(
+    db: Session = Depends(get_db),
+    scope: StatsScope = Depends(get_stats_scope),
+):
+    expired_count = func.sum(DailyInventoryStat.expired)
     result = (
-        db.query(
-            cast(UserProduct.expiryDate, Date).label("date"),
-            func.count(UserProduct.id).label("expired_count")
+        scoped(
+            db.query(
+                DailyInventoryStat.statDate.label("date"),
+                expired_count.label("expired_count"),
+            ),
+            scope,
         )
-        .filter(UserProduct.status == UserProductStatus.expired.value)
-        .group_by(cast(UserProduct.expiryDate, Date))
-        .order_by("date")
+        .group_by(DailyInventoryStat.statDate)
+        .having(expired_count > 0)
+        .order_by(DailyInventoryStat.statDate)
         .all()
     )
 
     return [
-        {"date": str(row.date), "expired_count": row.expired_count}
+        {"date": str(row.date), "expired_count": int(row.expired_count)}
         for row in result
     ]
 
 @router.get("/expiry-trends", response_model=List[ExpiryTrendItem])
-def get_expiry_trends(db: Session = Depends(get_db)):
+def get_expiry_trends(
+    db: Session = Depends(get_db),
+    scope: StatsScope = Depends(get_stats_scope),
+):
     """
     Bars = expiring items
     Line = simulated consumed before expiry (dummy: 60% of active)
     Area = estimated cost of wasted items (mock cost = 50 per item)
     """
     results = (
-        db.query(
-            func.date(UserProduct.expiryDate).label("date"),
-            func.count(UserProduct.id).label("expiring"),
-            func.sum(case((UserProduct.status == "expired", 1), else_=0)).label("expired")
+        scoped(
+            db.query(
+                DailyInventoryStat.statDate.label("date"),
+                func.sum(DailyInventoryStat.total).label("expiring"),
+                func.sum(DailyInventoryStat.expired).label("expired"),
+            ),
+            scope,
         )
-        .group_by(func.date(UserProduct.expiryDate))
-        .order_by(func.date(UserProduct.expiryDate))
+        .group_by(DailyInventoryStat.statDate)
+        .having(func.sum(DailyInventoryStat.total) > 0)
+        .order_by(DailyInventoryStat.statDate)
         .all()
     )
 
     data = []
     for date, expiring, expired in results:
+        expiring, expired = int(expiring), int(expired)
         active = expiring - expired
         consumed = int(active * random.uniform(0.4, 0.8))
         wasted_cost = expired * 50  
@@ -68,35 +97,46 @@ def get_expiry_trends(db: Session = Depends(get_db)):
     return data
 
 @router.get("/wastage-category", response_model=List[WastageCategoryItem])
-def get_wastage_by_category(db: Session = Depends(get_db)):
+def get_wastage_by_category(
+    db: Session = Depends(get_db),
+    scope: StatsScope = Depends(get_stats_scope),
+):
     """
     Percentage of wasted items by category
     """
-    total_expired = db.query(func.count(UserProduct.id)).filter(UserProduct.status == "expired").scalar()
-    if total_expired == 0:
-        return []
-
+    expired_count = func.sum(DailyInventoryStat.expired)
     results = (
-        db.query(Product.category, func.count(UserProduct.id))
-        .join(Product, Product.id == UserProduct.productId)
-        .filter(UserProduct.status == "expired")
-        .group_by(Product.category)
+        scoped(db.query(DailyInventoryStat.category, expired_count), scope)
+        .group_by(DailyInventoryStat.category)
+        .having(expired_count > 0)
         .all()
     )
+    total_expired = sum(int(count) for _, count in results)
+    if total_expired == 0:
+        return []
 
     return [
-        {"category": category, "percentage": round((count / total_expired) * 100, 2)}
+        {"category": category, "percentage": round((int(count) / total_expired) * 100, 2)}
         for category, count in results
     ]
 
 @router.get("/wasted-vs-eaten", response_model=List[WastedVsEatenItem])
-def get_wasted_vs_eaten(db: Session = Depends(get_db)):
-    expired_count = db.query(func.count(UserProduct.id)).filter(UserProduct.status == "expired").scalar()
-    active_count = db.query(func.count(UserProduct.id)).filter(UserProduct.status == "active").scalar()
+def get_wasted_vs_eaten(
+    db: Session = Depends(get_db),
+    scope: StatsScope = Depends(get_stats_scope),
+):
+    total_count, expired_count = scoped(
+        db.query(
+            func.coalesce(func.sum(DailyInventoryStat.total), 0),
+            func.coalesce(func.sum(DailyInventoryStat.expired), 0),
+        ),
+        scope,
+    ).one()
+    expired_count = int(expired_count)
 
     return [
         {"status": "wasted", "count": expired_count},
-        {"status": "active", "count": active_count}
+        {"status": "active", "count": int(total_count) - expired_count}
     ]
 
 @router.get("/nutrients/{product_id}", response_model=NutrientsResponse)
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Response, Request
-from app.models.user_model import User
+from app.services.user_cache import get_cached_user
 from app.db.session import get_db
 from sqlalchemy.orm import Session
 from app.utils.errors import AuthError
@@ -18,16 +18,10 @@ def get_user_profile(
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Same snapshot the inventory services use, so this is usually no query
+    user = get_cached_user(user_id, db)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return {
-        "id": user.id,
-        "name": user.name,
-        "dob": user.dob,
-        "email": user.email,
-        "createdAt": user.created_at,
-        "updatedAt": user.updated_at,
-    }
+    return user
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class BulkMarkReadRequest(BaseModel):
+    ids: Optional[List[str]] = None
+    before: Optional[str] = None
+
+
+class MarkReadResponse(BaseModel):
+    message: str
+    updated: int
@@ -0,0 +1,145 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+from app.utils.errors import ServiceOverloadedError
+
+load_dotenv()
+
+
+class AdmissionController:
+    """
+    Bounds how much CPU-heavy work an endpoint takes on. Up to max_in_flight
+    units run at once and up to max_queue requests wait for a slot, each for at
+    most queue_timeout seconds. Anything past those limits is rejected right
+    away with a 503 + Retry-After instead of piling up decoded images in memory.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        queue_timeout_ms: float,
+        retry_after_seconds: int = 1,
+    ):
+        self.name = name
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout_ms / 1000
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.waiting = 0
+        self._condition = None
+        self._releases = set()
+        self.stats = {
+            "admitted": 0,
+            "rejectedQueueFull": 0,
+            "rejectedDeadline": 0,
+        }
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _reject(self, reason: str):
+        raise ServiceOverloadedError(
+            detail=f"Server is busy ({self.name}: {reason}), please retry shortly.",
+            retry_after=self.retry_after_seconds,
+        )
+
+    def _has_room(self, weight: int) -> bool:
+        return self.in_flight + weight <= self.max_in_flight
+
+    async def acquire(self, weight: int = 1):
+        weight = min(max(1, weight), self.max_in_flight)
+
+        if self._has_room(weight) and not self.waiting:
+            self.in_flight += weight
+            self.stats["admitted"] += 1
+            return weight
+
+        if self.waiting >= self.max_queue:
+            self.stats["rejectedQueueFull"] += 1
+            self._reject("queue full")
+
+        condition = self._get_condition()
+        self.waiting += 1
+        try:
+            async with condition:
+                await asyncio.wait_for(
+                    condition.wait_for(lambda: self._has_room(weight)),
+                    self.queue_timeout,
+                )
+                self.in_flight += weight
+        except asyncio.TimeoutError:
+            self.stats["rejectedDeadline"] += 1
+            self._reject("queue deadline exceeded")
+        finally:
+            self.waiting -= 1
+
+        self.stats["admitted"] += 1
+        return weight
+
+    async def release(self, weight: int):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= weight
+            condition.notify_all()
+
+    def release_when_done(self, weight: int, tasks: list):
+        """Release `weight` once every task has finished (e.g. after streaming)."""
+
+        async def _release():
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.release(weight)
+
+        task = asyncio.create_task(_release())
+        self._releases.add(task)
+        task.add_done_callback(self._releases.discard)
+
+    @asynccontextmanager
+    async def slot(self, weight: int = 1):
+        """async with controller.slot(): ... — raises a 503 if not admitted."""
+        acquired = await self.acquire(weight)
+        try:
+            yield
+        finally:
+            await self.release(acquired)
+
+    def get_stats(self):
+        return {
+            "maxInFlight": self.max_in_flight,
+            "maxQueue": self.max_queue,
+            "queueTimeoutMs": self.queue_timeout * 1000,
+            "inFlight": self.in_flight,
+            "waiting": self.waiting,
+            **self.stats,
+        }
+
+
+detection_admission = AdmissionController(
+    "detection",
+    max_in_flight=int(os.getenv("DETECT_MAX_IN_FLIGHT", "16")),
+    max_queue=int(os.getenv("DETECT_MAX_QUEUE", "32")),
+    queue_timeout_ms=float(os.getenv("DETECT_QUEUE_TIMEOUT_MS", "2000")),
+    retry_after_seconds=int(os.getenv("DETECT_RETRY_AFTER_SECONDS", "2")),
+)
+
+qr_admission = AdmissionController(
+    "qr",
+    max_in_flight=int(os.getenv("QR_MAX_IN_FLIGHT", "8")),
+    max_queue=int(os.getenv("QR_MAX_QUEUE", "16")),
+    queue_timeout_ms=float(os.getenv("QR_QUEUE_TIMEOUT_MS", "1000")),
+    retry_after_seconds=int(os.getenv("QR_RETRY_AFTER_SECONDS", "1")),
+)
+
+
+def get_admission_stats():
+    return {
+        controller.name: controller.get_stats()
+        for controller in (detection_admission, qr_admission)
+    }
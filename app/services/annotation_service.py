@@ -0,0 +1,101 @@
+import asyncio
+import os
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from app.services.image_storage import get_image_storage
+from app.services.notification_service import send_notification_to_user
+from app.utils.image_utils import decode_image_bounded, draw_detections, encode_jpeg
+
+load_dotenv()
+
+ANNOTATION_WORKERS = int(os.getenv("ANNOTATION_WORKERS", "2"))
+# How many annotation jobs are remembered for /yolo/annotation/{id}
+ANNOTATION_JOBS_MAX = int(os.getenv("ANNOTATION_JOBS_MAX", "1000"))
+# Annotated images are rendered on a reduced decode at least this long
+ANNOTATION_MIN_SIDE = int(os.getenv("ANNOTATION_MIN_SIDE", "1280"))
+
+_executor = ThreadPoolExecutor(
+    max_workers=ANNOTATION_WORKERS, thread_name_prefix="annotation"
+)
+_tasks = set()
+
+annotation_jobs = OrderedDict()
+
+
+def _render_and_store(annotation_id: str, image_bytes: bytes, detections: list):
+    img, scale = decode_image_bounded(image_bytes, ANNOTATION_MIN_SIDE)
+    img = draw_detections(img, detections, scale)
+    return get_image_storage().save(f"{annotation_id}.jpg", encode_jpeg(img))
+
+
+async def _annotate(job: dict, image_bytes: bytes, detections: list):
+    annotation_id = job["annotationId"]
+    loop = asyncio.get_running_loop()
+    try:
+        url = await loop.run_in_executor(
+            _executor, _render_and_store, annotation_id, image_bytes, detections
+        )
+        job.update({"status": "ready", "url": url})
+    except Exception as e:
+        print(f"Annotation {annotation_id} failed: {e}")
+        job.update({"status": "failed", "error": str(e)})
+    finally:
+        job["updatedAt"] = datetime.utcnow().isoformat()
+
+    await send_notification_to_user(
+        job["userId"],
+        {
+            "type": "ANNOTATION_READY",
+            "annotationId": annotation_id,
+            "status": job["status"],
+            "annotated_image_url": job.get("url"),
+        },
+    )
+
+
+def schedule_annotation(user_id: str, image_bytes: bytes, detections: list) -> str:
+    """
+    Render and store the annotated image in the background. The URL is pushed
+    over the notification WebSocket and served by get_annotation.
+    """
+    annotation_id = uuid.uuid4().hex
+    job = {
+        "annotationId": annotation_id,
+        "userId": user_id,
+        "status": "pending",
+        "url": None,
+        "createdAt": datetime.utcnow().isoformat(),
+    }
+    annotation_jobs[annotation_id] = job
+    while len(annotation_jobs) > ANNOTATION_JOBS_MAX:
+        annotation_jobs.popitem(last=False)
+
+    task = asyncio.create_task(_annotate(job, image_bytes, detections))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return annotation_id
+
+
+def get_annotation(annotation_id: str, user_id: str):
+    job = annotation_jobs.get(annotation_id)
+    if not job or job["userId"] != user_id:
+        return None
+    return {key: value for key, value in job.items() if key != "userId"}
+
+
+def attach_annotation(result: dict, user_id: str, image_bytes: bytes, annotate: bool):
+    """Add the annotation fields to a detection response, scheduling the job."""
+    if annotate and result.get("detections"):
+        result["annotationId"] = schedule_annotation(
+            user_id, image_bytes, result["detections"]
+        )
+        result["annotationStatus"] = "pending"
+    else:
+        result["annotationId"] = None
+        result["annotationStatus"] = "skipped"
+    return result
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.product_model import Product
+
+load_dotenv()
+
+BARCODE_INDEX_MAX_ENTRIES = int(os.getenv("BARCODE_INDEX_MAX_ENTRIES", "50000"))
+# Reload from the database this often, so writes made by other worker
+# processes show up even though they can't invalidate this process's copy
+BARCODE_INDEX_TTL_SECONDS = float(os.getenv("BARCODE_INDEX_TTL_SECONDS", "300"))
+
+
+class BarcodeIndex:
+    """
+    Process-local barcode -> product name map, kept current by the product
+    write paths and falling back to the database for barcodes it doesn't hold.
+    Loads run in a background thread and swap the map in whole, so lookups keep
+    being served from the previous copy (or the database) meanwhile.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = BARCODE_INDEX_MAX_ENTRIES,
+        ttl_seconds: float = BARCODE_INDEX_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._names = OrderedDict()  # barcode -> product name
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._loading = False
+        # Writes made while a load runs, replayed onto the loaded map
+        self._pending = []
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "loadErrors": 0}
+
+    def _is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl_seconds
+        )
+
+    def _load(self):
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(Product.barcode, Product.name)
+                .order_by(Product.addedAt.desc())
+                .limit(self.max_entries)
+                .all()
+            )
+        finally:
+            db.close()
+
+        # Oldest first, so the most recent products are the last evicted
+        names = OrderedDict((barcode, name) for barcode, name in reversed(rows))
+        with self._lock:
+            for barcode, name, previous_barcode in self._pending:
+                self._apply(names, barcode, name, previous_barcode)
+            self._names = names
+            self._loaded_at = time.monotonic()
+            self.stats["loads"] += 1
+
+    def _load_in_background(self):
+        try:
+            self._load()
+        except Exception:
+            with self._lock:
+                # Retry after another TTL rather than on every lookup; misses
+                # are still answered from the database meanwhile
+                self._loaded_at = time.monotonic()
+                self.stats["loadErrors"] += 1
+        finally:
+            with self._lock:
+                self._loading = False
+                self._pending = []
+
+    def refresh(self):
+        """Start a background reload unless one is already running."""
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(
+            target=self._load_in_background, name="barcode-index", daemon=True
+        ).start()
+
+    def _remember(self, names: OrderedDict, barcode: str, name: str):
+        names[barcode] = name
+        names.move_to_end(barcode)
+        while len(names) > self.max_entries:
+            names.popitem(last=False)
+
+    def _apply(self, names: OrderedDict, barcode, name, previous_barcode):
+        if previous_barcode and previous_barcode != barcode:
+            names.pop(previous_barcode, None)
+        if barcode and name is not None:
+            self._remember(names, barcode, name)
+        elif barcode:
+            names.pop(barcode, None)
+
+    def _write(self, barcode, name, previous_barcode=None):
+        with self._lock:
+            self._apply(self._names, barcode, name, previous_barcode)
+            if self._loading:
+                self._pending.append((barcode, name, previous_barcode))
+
+    def lookup(self, barcode: str, db: Session):
+        """Product name for a barcode, or None if no product carries it."""
+        if self._is_stale():
+            self.refresh()
+
+        with self._lock:
+            name = self._names.get(barcode)
+            if name is not None:
+                self._names.move_to_end(barcode)
+                self.stats["hits"] += 1
+                return name
+            self.stats["misses"] += 1
+
+        product = db.query(Product.name).filter(Product.barcode == barcode).first()
+        if not product:
+            return None
+        with self._lock:
+            self._remember(self._names, barcode, product.name)
+        return product.name
+
+    def put(self, barcode: str, name: str, previous_barcode: str = None):
+        """Record a created or updated product."""
+        self._write(barcode, name, previous_barcode)
+
+    def remove(self, barcode: str):
+        self._write(barcode, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._names.clear()
+            self._loaded_at = None
+
+    def get_stats(self):
+        return {
+            "entries": len(self._names),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "loading": self._loading,
+            **self.stats,
+        }
+
+
+barcode_index = BarcodeIndex()
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from app.db.session import SessionLocal
+from app.models.product_model import Product
+from app.utils.fuzzy_index import TrigramIndex
+from app.utils.product_utils import SHELF_LIFE_MAP, normalize_product_name
+
+load_dotenv()
+
+# Lowest score reported as a match for a detection label
+CATALOG_MATCH_MIN_SCORE = float(os.getenv("CATALOG_MATCH_MIN_SCORE", "0.5"))
+# Lowest score at which the add path reuses a product instead of creating one
+CATALOG_MATCH_AUTO_SCORE = float(os.getenv("CATALOG_MATCH_AUTO_SCORE", "0.75"))
+CATALOG_MATCH_TTL_SECONDS = float(os.getenv("CATALOG_MATCH_TTL_SECONDS", "300"))
+
+
+def _shelf_life_entry(key: str):
+    return {"productId": None, "name": key.title(), "shelfLifeDays": SHELF_LIFE_MAP[key]}
+
+
+class CatalogMatcher:
+    """
+    Fuzzy name -> catalog lookup over every product name plus the
+    SHELF_LIFE_MAP keys. The trigram index is built in a background thread
+    (at startup and every ttl_seconds) and swapped in whole, so lookups keep
+    using the previous index while it builds. The product write paths keep it
+    current in between.
+    """
+
+    def __init__(self, ttl_seconds: float = CATALOG_MATCH_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        # Until the first load finishes, only the shelf-life names match
+        self._index = self._new_index()
+        self._loaded_at = None
+        self._loading = False
+        # Writes made while a load runs, replayed onto the new index
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _new_index():
+        index = TrigramIndex()
+        for key in SHELF_LIFE_MAP:
+            index.add(key, _shelf_life_entry(key))
+        return index
+
+    def _load(self):
+        db = SessionLocal()
+        try:
+            rows = db.query(Product.id, Product.name).all()
+        finally:
+            db.close()
+
+        index = self._new_index()
+        for product_id, name in rows:
+            self._put(index, product_id, name)
+        with self._lock:
+            for args in self._pending:
+                self._apply(index, *args)
+            self._index = index
+            self._loaded_at = time.monotonic()
+
+    def _load_in_background(self):
+        try:
+            self._load()
+        except Exception:
+            with self._lock:
+                # Keep serving the old index and retry after another TTL
+                self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading = False
+                self._pending = []
+
+    def refresh(self):
+        """Start a background rebuild unless one is already running."""
+        with self._lock:
+            if self._loading:
+                return
+            self._loading = True
+        threading.Thread(
+            target=self._load_in_background, name="catalog-matcher", daemon=True
+        ).start()
+
+    def _refresh_if_stale(self):
+        if (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl_seconds
+        ):
+            self.refresh()
+
+    def match(
+        self,
+        name: str,
+        limit: int = 5,
+        min_score: float = CATALOG_MATCH_MIN_SCORE,
+    ):
+        """Top `limit` catalog entries for a free-text name, best first."""
+        self._refresh_if_stale()
+        with self._lock:
+            matches = self._index.search(
+                normalize_product_name(name), limit=limit, min_score=min_score
+            )
+        return [{**payload, "score": score} for _, payload, score in matches]
+
+    def match_product(self, name: str, min_score: float = CATALOG_MATCH_AUTO_SCORE):
+        """Closest existing product for a name, or None below min_score."""
+        for match in self.match(name, limit=5, min_score=min_score):
+            if match["productId"]:
+                return match
+        return None
+
+    @staticmethod
+    def _put(index: TrigramIndex, product_id: str, name: str):
+        key = normalize_product_name(name)
+        index.add(
+            key,
+            {
+                "productId": product_id,
+                "name": name,
+                "shelfLifeDays": SHELF_LIFE_MAP.get(key),
+            },
+        )
+
+    @staticmethod
+    def _remove(index: TrigramIndex, name: str):
+        key = normalize_product_name(name)
+        index.remove(key)
+        # A shelf-life entry shadowed by the product becomes visible again
+        if key in SHELF_LIFE_MAP:
+            index.add(key, _shelf_life_entry(key))
+
+    def _apply(self, index, product_id, name, previous_name):
+        if previous_name:
+            self._remove(index, previous_name)
+        if product_id:
+            self._put(index, product_id, name)
+
+    def _write(self, product_id, name, previous_name):
+        with self._lock:
+            self._apply(self._index, product_id, name, previous_name)
+            if self._loading:
+                self._pending.append((product_id, name, previous_name))
+
+    def put(self, product_id: str, name: str, previous_name: str = None):
+        self._write(product_id, name, previous_name)
+
+    def remove(self, name: str):
+        self._write(None, None, name)
+
+
+catalog_matcher = CatalogMatcher()
+
+
+def attach_catalog_matches(result: dict):
+    """Add the best catalog entry (or None) to each detection as catalogMatch."""
+    for detection in result.get("detections", []):
+        matches = catalog_matcher.match(detection["name"], limit=1)
+        detection["catalogMatch"] = matches[0] if matches else None
+    return result
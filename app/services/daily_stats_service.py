@@ -0,0 +1,199 @@
+"""
+Incremental maintenance of daily_inventory_stats. Every helper only adds an
+upsert to the caller's session, so the aggregate commits (or rolls back) with
+the userProducts write it describes. rebuild_daily_stats recomputes the whole
+table if it ever drifts.
+"""
+
+from datetime import date
+
+from sqlalchemy import Date, case, cast, func, select
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+
+from app.models.daily_stats_model import DailyInventoryStat
+from app.models.product_model import Product
+from app.models.user_product import UserProduct, UserProductStatus
+
+
+def _stat_date(expiry_date: str):
+    # expiryDate is an ISO string; the day is what CAST(... AS DATE) yields
+    try:
+        return date.fromisoformat(str(expiry_date)[:10])
+    except ValueError:
+        return None
+
+
+def _is_expired(user_product: UserProduct) -> bool:
+    return user_product.status in (
+        UserProductStatus.expired,
+        UserProductStatus.expired.value,
+    )
+
+
+def _product_category(product_id: str, db: Session) -> str:
+    category = db.query(Product.category).filter(Product.id == product_id).scalar()
+    return category or "Uncategorized"
+
+
+def apply_delta(
+    db: Session,
+    user_id: str,
+    expiry_date: str,
+    category: str,
+    total: int = 0,
+    expired: int = 0,
+):
+    stat_date = _stat_date(expiry_date)
+    if stat_date is None or (not total and not expired):
+        return
+
+    stmt = insert(DailyInventoryStat).values(
+        statDate=stat_date,
+        userId=user_id,
+        category=category,
+        total=total,
+        expired=expired,
+    )
+    db.execute(
+        stmt.on_duplicate_key_update(
+            total=DailyInventoryStat.total + stmt.inserted.total,
+            expired=DailyInventoryStat.expired + stmt.inserted.expired,
+        )
+    )
+
+
+def record_user_product_added(db: Session, user_product: UserProduct):
+    apply_delta(
+        db,
+        user_product.userId,
+        user_product.expiryDate,
+        _product_category(user_product.productId, db),
+        total=1,
+        expired=int(_is_expired(user_product)),
+    )
+
+
+def record_user_product_removed(db: Session, user_product: UserProduct):
+    apply_delta(
+        db,
+        user_product.userId,
+        user_product.expiryDate,
+        _product_category(user_product.productId, db),
+        total=-1,
+        expired=-int(_is_expired(user_product)),
+    )
+
+
+def record_user_product_moved(
+    db: Session, user_product: UserProduct, previous_expiry_date: str
+):
+    """The expiry date of a user product changed."""
+    if _stat_date(previous_expiry_date) == _stat_date(user_product.expiryDate):
+        return
+    category = _product_category(user_product.productId, db)
+    expired = int(_is_expired(user_product))
+    apply_delta(
+        db,
+        user_product.userId,
+        previous_expiry_date,
+        category,
+        total=-1,
+        expired=-expired,
+    )
+    apply_delta(
+        db,
+        user_product.userId,
+        user_product.expiryDate,
+        category,
+        total=1,
+        expired=expired,
+    )
+
+
+def record_user_product_expired(
+    db: Session, user_product: UserProduct, category: str = None
+):
+    apply_delta(
+        db,
+        user_product.userId,
+        user_product.expiryDate,
+        category or _product_category(user_product.productId, db),
+        expired=1,
+    )
+
+
+def _product_groups(db: Session, product_id: str):
+    expired = func.sum(case((UserProduct.status == "expired", 1), else_=0))
+    return (
+        db.query(
+            UserProduct.userId,
+            UserProduct.expiryDate,
+            func.count(UserProduct.id),
+            expired,
+        )
+        .filter(UserProduct.productId == product_id)
+        .group_by(UserProduct.userId, UserProduct.expiryDate)
+        .all()
+    )
+
+
+def record_product_removed(db: Session, product_id: str, category: str):
+    """All user products of a catalog product are about to be deleted."""
+    for user_id, expiry_date, total, expired in _product_groups(db, product_id):
+        apply_delta(
+            db, user_id, expiry_date, category, total=-total, expired=-int(expired)
+        )
+
+
+def record_product_recategorized(
+    db: Session, product_id: str, previous_category: str, category: str
+):
+    if previous_category == category:
+        return
+    for user_id, expiry_date, total, expired in _product_groups(db, product_id):
+        apply_delta(
+            db,
+            user_id,
+            expiry_date,
+            previous_category,
+            total=-total,
+            expired=-int(expired),
+        )
+        apply_delta(
+            db, user_id, expiry_date, category, total=total, expired=int(expired)
+        )
+
+
+def rebuild_daily_stats(db: Session, user_id: str = None) -> int:
+    """
+    Recompute daily_inventory_stats from userProducts, for one user or for
+    everyone. Returns the number of rows written.
+    """
+    stat_date = cast(UserProduct.expiryDate, Date)
+    aggregate = (
+        select(
+            stat_date,
+            UserProduct.userId,
+            Product.category,
+            func.count(UserProduct.id),
+            func.sum(case((UserProduct.status == "expired", 1), else_=0)),
+        )
+        .select_from(UserProduct)
+        .join(Product, Product.id == UserProduct.productId)
+        .where(stat_date.isnot(None))
+        .group_by(stat_date, UserProduct.userId, Product.category)
+    )
+    existing = db.query(DailyInventoryStat)
+    if user_id is not None:
+        aggregate = aggregate.where(UserProduct.userId == user_id)
+        existing = existing.filter(DailyInventoryStat.userId == user_id)
+
+    existing.delete(synchronize_session=False)
+    result = db.execute(
+        insert(DailyInventoryStat).from_select(
+            ["statDate", "userId", "category", "total", "expired"], aggregate
+        )
+    )
+    db.commit()
+    return result.rowcount
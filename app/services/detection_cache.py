@@ -0,0 +1,113 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+YOLO_CACHE_ENABLED = os.getenv("YOLO_CACHE_ENABLED", "true").lower() == "true"
+YOLO_CACHE_MAX_ENTRIES = int(os.getenv("YOLO_CACHE_MAX_ENTRIES", "1024"))
+YOLO_CACHE_TTL_SECONDS = float(os.getenv("YOLO_CACHE_TTL_SECONDS", "600"))
+# Max differing bits (out of 64) for two images to count as the same photo
+YOLO_CACHE_MAX_DISTANCE = int(os.getenv("YOLO_CACHE_MAX_DISTANCE", "4"))
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DetectionCache:
+    """
+    LRU + TTL cache of detection results keyed by (image size, perceptual
+    hash). Cached bboxes are absolute pixels, so only images of the same size
+    may share a result. A lookup matches the exact key first, then any entry of
+    that size within max_distance bits. The near-match scan is linear in the
+    entries, so callers off the event loop should use it via a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = YOLO_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = YOLO_CACHE_TTL_SECONDS,
+        max_distance: int = YOLO_CACHE_MAX_DISTANCE,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self._entries = OrderedDict()  # (size, hash) -> (expires_at, result)
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "nearHits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _find(self, cache_key: tuple, now: float):
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry[0] > now:
+            return cache_key, False
+
+        size, image_hash = cache_key
+        best_key, best_distance = None, self.max_distance + 1
+        for key, (expires_at, _) in self._entries.items():
+            if expires_at <= now or key[0] != size:
+                continue
+            distance = hamming_distance(image_hash, key[1])
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key, True
+
+    def _expire(self, now: float):
+        expired = [
+            key for key, (expires_at, _) in self._entries.items() if expires_at <= now
+        ]
+        for key in expired:
+            del self._entries[key]
+        self.stats["expirations"] += len(expired)
+
+    def get(self, cache_key: tuple):
+        """Return a private copy of the cached result, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            key, near = self._find(cache_key, now)
+            if key is None:
+                self.stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats["nearHits" if near else "hits"] += 1
+            result = self._entries[key][1]
+        return copy.deepcopy(result)
+
+    def set(self, cache_key: tuple, result: dict):
+        now = time.monotonic()
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries[cache_key] = (now + self.ttl_seconds, result)
+            self._entries.move_to_end(cache_key)
+            if len(self._entries) > self.max_entries:
+                self._expire(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def get_stats(self):
+        lookups = self.stats["hits"] + self.stats["nearHits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["nearHits"]
+        return {
+            "enabled": YOLO_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "maxDistance": self.max_distance,
+            "hitRate": round(hits / lookups, 4) if lookups else 0,
+            **self.stats,
+        }
+
+
+detection_cache = DetectionCache()
@@ -0,0 +1,247 @@
+import asyncio
+import gc
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+
+from app.services.admission_control import get_admission_stats
+from app.services.detection_cache import YOLO_CACHE_ENABLED, detection_cache
+from app.services.micro_batcher import MicroBatcher
+from app.utils.errors import PayloadTooLargeError
+from app.utils.image_utils import ImageTooLargeError, dhash, read_image_size
+
+load_dotenv()
+
+# "process" runs inference in worker processes, each with its own model copy.
+# "thread" keeps it in-process (useful for debugging or GIL-releasing backends).
+YOLO_POOL_MODE = os.getenv("YOLO_POOL_MODE", "process")
+YOLO_POOL_WORKERS = int(os.getenv("YOLO_POOL_WORKERS", "2"))
+# Max detection jobs handed to the pool at once; the rest wait in the queue
+YOLO_POOL_MAX_CONCURRENCY = int(
+    os.getenv("YOLO_POOL_MAX_CONCURRENCY", str(YOLO_POOL_WORKERS))
+)
+YOLO_POOL_START_METHOD = os.getenv("YOLO_POOL_START_METHOD", "spawn")
+# Concurrent requests are gathered for up to YOLO_BATCH_MAX_WAIT_MS or
+# YOLO_BATCH_MAX_SIZE images and run as one predict call. Size 1 disables it.
+YOLO_BATCH_MAX_SIZE = int(os.getenv("YOLO_BATCH_MAX_SIZE", "8"))
+YOLO_BATCH_MAX_WAIT_MS = float(os.getenv("YOLO_BATCH_MAX_WAIT_MS", "5"))
+YOLO_MAX_UPLOAD_BYTES = int(os.getenv("YOLO_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+YOLO_MAX_IMAGE_PIXELS = int(os.getenv("YOLO_MAX_IMAGE_PIXELS", str(50_000_000)))
+
+_executor = None
+_semaphore = None
+
+pool_stats = {
+    "queued": 0,
+    "inFlight": 0,
+    "completed": 0,
+    "failed": 0,
+}
+
+readiness = {
+    "ready": False,
+    "error": None,
+    "workers": [],
+}
+
+
+def _init_worker():
+    # Load (and warm up) the model once per worker, before its first job.
+    # With a preloaded forked parent the weights are already there and shared
+    # copy-on-write; only the warm-up runs here.
+    from app.services import yolo_service
+
+    if yolo_service.YOLO_MODEL_LOAD == "preload":
+        yolo_service.load_model()
+
+
+def _worker_status():
+    from app.services.yolo_service import model_state
+
+    return dict(model_state)
+
+
+def _detect_batch(images: list):
+    from app.services.yolo_service import detect_objects_batch
+
+    return detect_objects_batch(images)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if YOLO_POOL_MODE == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=YOLO_POOL_WORKERS,
+                thread_name_prefix="yolo",
+                initializer=_init_worker,
+            )
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=YOLO_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(YOLO_POOL_START_METHOD),
+                initializer=_init_worker,
+            )
+    return _executor
+
+
+def _get_semaphore():
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(YOLO_POOL_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def run_in_detection_pool(func, *args):
+    """
+    Run a picklable, module-level function in the detection pool and await it.
+    At most YOLO_POOL_MAX_CONCURRENCY jobs run at once; the rest are queued.
+    """
+    loop = asyncio.get_running_loop()
+    admitted = False
+    pool_stats["queued"] += 1
+    try:
+        async with _get_semaphore():
+            admitted = True
+            pool_stats["queued"] -= 1
+            pool_stats["inFlight"] += 1
+            try:
+                result = await loop.run_in_executor(get_executor(), func, *args)
+            except Exception:
+                pool_stats["failed"] += 1
+                raise
+            finally:
+                pool_stats["inFlight"] -= 1
+    finally:
+        # Cancelled while still waiting for a slot
+        if not admitted:
+            pool_stats["queued"] -= 1
+    pool_stats["completed"] += 1
+    return result
+
+
+async def _process_detection_batch(images: list):
+    return await run_in_detection_pool(_detect_batch, images)
+
+
+detection_batcher = MicroBatcher(
+    _process_detection_batch,
+    max_batch_size=YOLO_BATCH_MAX_SIZE,
+    max_wait_ms=YOLO_BATCH_MAX_WAIT_MS,
+)
+
+
+def validate_image_upload(image_bytes: bytes):
+    """Reject uploads that would be too expensive to decode, from the header alone."""
+    if len(image_bytes) > YOLO_MAX_UPLOAD_BYTES:
+        raise PayloadTooLargeError(
+            detail=f"Image exceeds the {YOLO_MAX_UPLOAD_BYTES} byte upload limit"
+        )
+    too_large = PayloadTooLargeError(
+        detail=f"Image exceeds the {YOLO_MAX_IMAGE_PIXELS} pixel limit"
+    )
+    try:
+        size = read_image_size(image_bytes)
+    except ImageTooLargeError:
+        # Past even PIL's own decompression-bomb limit
+        raise too_large
+    if size is None:
+        # Without a size the pixel limit can't be checked, so don't decode it
+        raise HTTPException(status_code=400, detail="Could not read the image header")
+    if size[0] * size[1] > YOLO_MAX_IMAGE_PIXELS:
+        raise too_large
+
+
+def _cache_key(image_bytes: bytes):
+    # Cached bboxes are in original pixels, so the size is part of the key
+    size = read_image_size(image_bytes)
+    image_hash = dhash(image_bytes)
+    if size is None or image_hash is None:
+        return None
+    return size, image_hash
+
+
+async def run_detection(image_bytes: bytes):
+    """
+    Detect objects in an encoded image. Near-duplicate re-uploads are answered
+    from the perceptual-hash cache without touching the model.
+    """
+    cache_key = None
+    if YOLO_CACHE_ENABLED:
+        cache_key = await asyncio.to_thread(_cache_key, image_bytes)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(detection_cache.get, cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+
+    result = await detection_batcher.submit(image_bytes)
+    if cache_key is not None:
+        await asyncio.to_thread(detection_cache.set, cache_key, result)
+    result["cached"] = False
+    return result
+
+
+def get_pool_stats():
+    return {
+        "mode": YOLO_POOL_MODE,
+        "workers": YOLO_POOL_WORKERS,
+        "maxConcurrency": YOLO_POOL_MAX_CONCURRENCY,
+        "started": _executor is not None,
+        **pool_stats,
+        "batching": detection_batcher.get_stats(),
+        "admission": get_admission_stats(),
+    }
+
+
+async def start_detection_pool():
+    """
+    Start the pool and, in preload mode, wait until every worker has loaded and
+    warmed up its model. Run as a background task; readiness reports progress.
+    """
+    from app.services import yolo_service
+
+    try:
+        if yolo_service.YOLO_MODEL_LOAD != "preload":
+            get_executor()
+            readiness["ready"] = True
+            return
+
+        if YOLO_POOL_MODE == "process" and YOLO_POOL_START_METHOD == "fork":
+            # Load weights (without running inference, which would start
+            # intra-op threads) before forking so workers share them
+            # copy-on-write. gc.freeze keeps the collector from touching, and
+            # so copying, those pages in the children.
+            await asyncio.to_thread(yolo_service.load_model, False)
+            gc.freeze()
+
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        readiness["workers"] = await asyncio.gather(
+            *[
+                loop.run_in_executor(executor, _worker_status)
+                for _ in range(YOLO_POOL_WORKERS)
+            ]
+        )
+        readiness["ready"] = True
+        print(
+            f"Detection pool ready with {YOLO_POOL_WORKERS} {YOLO_POOL_MODE} workers"
+        )
+    except Exception as e:
+        readiness["error"] = str(e)
+        print(f"Detection pool failed to start: {e}")
+
+
+def get_readiness():
+    return dict(readiness)
+
+
+async def shutdown_detection_pool():
+    global _executor
+    await detection_batcher.close()
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import time
+
+from fastapi import HTTPException, WebSocket
+from fastapi.websockets import WebSocketDisconnect
+
+from app.services.admission_control import detection_admission
+from app.services.catalog_matcher import attach_catalog_matches
+from app.services.detection_pool import run_detection, validate_image_upload
+from app.utils.jwt import decode_access_token
+
+
+async def detection_websocket(websocket: WebSocket, access_token: str = None):
+    """
+    Live camera detection. The client sends JPEG frames as binary messages and
+    gets a DETECTION message back per processed frame. Only the newest frame is
+    kept: frames that arrive while inference is busy replace the waiting one
+    and are counted as dropped, so results never lag behind the camera.
+    """
+    payload = decode_access_token(access_token) if access_token else None
+    if not payload:
+        await websocket.close(code=1008, reason="Access token required")
+        return
+
+    await websocket.accept()
+    user_id = payload.get("userId")
+
+    state = {"latest": None, "received": 0, "dropped": 0, "processed": 0}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            frame = message.get("bytes")
+            if frame is None:
+                if message.get("text") == "PING":
+                    await websocket.send_text(json.dumps({"type": "pong"}))
+                continue
+
+            state["received"] += 1
+            if state["latest"] is not None:
+                state["dropped"] += 1
+            state["latest"] = (state["received"], frame)
+            frame_ready.set()
+
+    async def detect_frames():
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            frame_id, frame = state["latest"]
+            state["latest"] = None
+
+            started = time.perf_counter()
+            try:
+                async with detection_admission.slot():
+                    validate_image_upload(frame)
+                    result = await run_detection(frame)
+                attach_catalog_matches(result)
+            except Exception as e:
+                message = e.detail if isinstance(e, HTTPException) else str(e)
+                await websocket.send_text(
+                    json.dumps(
+                        {"type": "ERROR", "frameId": frame_id, "message": message}
+                    )
+                )
+                continue
+
+            state["processed"] += 1
+            await websocket.send_text(
+                json.dumps(
+                    {
+                        "type": "DETECTION",
+                        "frameId": frame_id,
+                        "detections": result.get("detections", []),
+                        "latencyMs": round((time.perf_counter() - started) * 1000, 1),
+                        "dropped": state["dropped"],
+                    }
+                )
+            )
+
+    await websocket.send_text(
+        json.dumps(
+            {
+                "type": "CONNECTION_ESTABLISHED",
+                "message": "Detection WebSocket connected",
+                "userId": user_id,
+            }
+        )
+    )
+
+    detector = asyncio.create_task(detect_frames())
+    try:
+        await receive_frames()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        detector.cancel()
+        print(
+            f"Detection WebSocket closed for user {user_id}: "
+            f"{state['processed']} processed, {state['dropped']} dropped"
+        )
@@ -0,0 +1,104 @@
+import io
+import os
+
+from dotenv import load_dotenv
+
+from app.core.auth import ROOT_PATH
+
+load_dotenv()
+
+# cloudinary, local or s3 (any S3-compatible endpoint, e.g. MinIO)
+IMAGE_STORAGE_BACKEND = os.getenv("IMAGE_STORAGE_BACKEND", "cloudinary")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "uploads/annotated")
+# Where the local directory is mounted on the app, and so the public URL
+# prefix once the root_path is added. Files there are served without a token
+# (an <img> tag sends none); the names are random annotation ids.
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "/uploads/annotated")
+LOCAL_STORAGE_PUBLIC_PREFIX = f"{ROOT_PATH}{LOCAL_STORAGE_BASE_URL.rstrip('/')}/"
+S3_BUCKET = os.getenv("S3_BUCKET")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL")
+
+# Every storage exposes save(key, data, content_type) -> public URL.
+# save() is blocking; callers run it off the event loop.
+
+
+class CloudinaryStorage:
+    name = "cloudinary"
+
+    def __init__(self):
+        import cloudinary
+
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+            secure=True,
+        )
+
+    def save(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
+        from cloudinary.uploader import upload
+
+        public_id = os.path.splitext(key)[0]
+        upload_result = upload(io.BytesIO(data), public_id=public_id)
+        return upload_result.get("secure_url")
+
+
+class LocalStorage:
+    name = "local"
+
+    def __init__(self, directory: str = LOCAL_STORAGE_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def save(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
+        with open(os.path.join(self.directory, key), "wb") as f:
+            f.write(data)
+        return f"{LOCAL_STORAGE_PUBLIC_PREFIX}{key}"
+
+
+class S3Storage:
+    name = "s3"
+
+    def __init__(self, bucket: str = S3_BUCKET):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("IMAGE_STORAGE_BACKEND=s3 requires the boto3 package")
+        if not bucket:
+            raise RuntimeError("IMAGE_STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+        self.bucket = bucket
+        # Credentials come from the standard AWS_* environment variables
+        self.client = boto3.client("s3", endpoint_url=S3_ENDPOINT_URL)
+
+    def save(self, key: str, data: bytes, content_type: str = "image/jpeg") -> str:
+        self.client.put_object(
+            Bucket=self.bucket, Key=key, Body=data, ContentType=content_type
+        )
+        if S3_PUBLIC_BASE_URL:
+            return f"{S3_PUBLIC_BASE_URL.rstrip('/')}/{key}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=86400
+        )
+
+
+STORAGE_BACKENDS = {
+    CloudinaryStorage.name: CloudinaryStorage,
+    LocalStorage.name: LocalStorage,
+    S3Storage.name: S3Storage,
+}
+
+_storage = None
+
+
+def get_image_storage():
+    global _storage
+    if _storage is None:
+        if IMAGE_STORAGE_BACKEND not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"Unknown IMAGE_STORAGE_BACKEND '{IMAGE_STORAGE_BACKEND}', "
+                f"expected one of {', '.join(STORAGE_BACKENDS)}"
+            )
+        _storage = STORAGE_BACKENDS[IMAGE_STORAGE_BACKEND]()
+    return _storage
@@ -0,0 +1,246 @@
+import ast
+import os
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+from app.utils.image_utils import letterbox, scale_boxes
+
+load_dotenv()
+
+# ultralytics (PyTorch), onnxruntime or openvino
+YOLO_BACKEND = os.getenv("YOLO_BACKEND", "ultralytics")
+YOLO_MODEL_PATH = os.getenv("YOLO_MODEL_PATH", "best.pt")
+YOLO_ONNX_PATH = os.getenv("YOLO_ONNX_PATH", "best.onnx")
+YOLO_OPENVINO_PATH = os.getenv("YOLO_OPENVINO_PATH", "best_openvino_model")
+YOLO_IMG_SIZE = int(os.getenv("YOLO_IMG_SIZE", "640"))
+YOLO_CONF_THRESHOLD = float(os.getenv("YOLO_CONF_THRESHOLD", "0.25"))
+YOLO_IOU_THRESHOLD = float(os.getenv("YOLO_IOU_THRESHOLD", "0.7"))
+
+# Every backend exposes `names` (class id -> label) and `predict(images)`, which
+# takes a list of BGR images and returns one (xyxy, conf, cls) tuple of NumPy
+# arrays per image, with boxes in that image's pixel coordinates.
+
+
+def _empty_detections():
+    return (
+        np.zeros((0, 4), dtype=np.float32),
+        np.zeros((0,), dtype=np.float32),
+        np.zeros((0,), dtype=np.int64),
+    )
+
+
+class UltralyticsBackend:
+    name = "ultralytics"
+
+    def __init__(self, model_path: str = YOLO_MODEL_PATH):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def predict(self, images: list):
+        results = self.model.predict(
+            source=images,
+            conf=YOLO_CONF_THRESHOLD,
+            iou=YOLO_IOU_THRESHOLD,
+            imgsz=YOLO_IMG_SIZE,
+            verbose=False,
+        )
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                detections.append(_empty_detections())
+                continue
+            detections.append(
+                (
+                    boxes.xyxy.cpu().numpy(),
+                    boxes.conf.cpu().numpy(),
+                    boxes.cls.cpu().numpy().astype(np.int64),
+                )
+            )
+        return detections
+
+
+class ExportedModelBackend:
+    """
+    Shared pre/post-processing for exported YOLOv8-style graphs whose output is
+    (batch, 4 + num_classes, anchors) with xywh boxes in letterboxed pixels.
+    """
+
+    dynamic_batch = True
+
+    def _run(self, batch):
+        raise NotImplementedError
+
+    def _preprocess(self, images):
+        tensors, transforms = [], []
+        for img in images:
+            padded, ratio, pad = letterbox(img, YOLO_IMG_SIZE)
+            # BGR HWC uint8 -> RGB CHW float32 in [0, 1]
+            tensors.append(padded[:, :, ::-1].transpose(2, 0, 1))
+            transforms.append((ratio, pad, img.shape))
+        batch = np.ascontiguousarray(np.stack(tensors), dtype=np.float32) / 255.0
+        return batch, transforms
+
+    def _postprocess(self, output, transform):
+        predictions = output.T  # (anchors, 4 + num_classes)
+        scores = predictions[:, 4:]
+        cls = scores.argmax(axis=1)
+        conf = scores[np.arange(len(cls)), cls]
+        keep = conf >= YOLO_CONF_THRESHOLD
+        if not keep.any():
+            return _empty_detections()
+
+        xywh, conf, cls = predictions[keep, :4], conf[keep], cls[keep]
+        xyxy = np.empty_like(xywh)
+        xyxy[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        xyxy[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+        # Class-aware NMS: offset each class so boxes of different classes never overlap
+        offset = cls[:, None].astype(np.float32) * (YOLO_IMG_SIZE * 2)
+        shifted = xyxy + offset
+        nms_boxes = np.column_stack(
+            (shifted[:, :2], shifted[:, 2:] - shifted[:, :2])
+        ).tolist()
+        indices = cv2.dnn.NMSBoxes(
+            nms_boxes, conf.tolist(), YOLO_CONF_THRESHOLD, YOLO_IOU_THRESHOLD
+        )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+        indices = indices[np.argsort(-conf[indices])]
+
+        ratio, pad, original_shape = transform
+        return (
+            scale_boxes(xyxy[indices], ratio, pad, original_shape),
+            conf[indices].astype(np.float32),
+            cls[indices].astype(np.int64),
+        )
+
+    def predict(self, images: list):
+        batch, transforms = self._preprocess(images)
+        if self.dynamic_batch:
+            outputs = self._run(batch)
+        else:
+            outputs = np.concatenate(
+                [self._run(batch[i : i + 1]) for i in range(len(batch))]
+            )
+        return [
+            self._postprocess(output, transform)
+            for output, transform in zip(outputs, transforms)
+        ]
+
+
+class OnnxRuntimeBackend(ExportedModelBackend):
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str = YOLO_ONNX_PATH):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError(
+                "YOLO_BACKEND=onnxruntime requires the onnxruntime package"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else {}
+
+    def _run(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(ExportedModelBackend):
+    name = "openvino"
+
+    def __init__(self, model_dir: str = YOLO_OPENVINO_PATH):
+        try:
+            import openvino as ov
+            import yaml
+        except ImportError:
+            raise RuntimeError("YOLO_BACKEND=openvino requires the openvino package")
+
+        xml_files = [f for f in os.listdir(model_dir) if f.endswith(".xml")]
+        if not xml_files:
+            raise RuntimeError(f"No OpenVINO model (.xml) found in {model_dir}")
+
+        core = ov.Core()
+        model = core.read_model(os.path.join(model_dir, xml_files[0]))
+        self.dynamic_batch = model.inputs[0].get_partial_shape()[0].is_dynamic
+        self.compiled = core.compile_model(
+            model, "CPU", {"PERFORMANCE_HINT": "THROUGHPUT"}
+        )
+
+        metadata_path = os.path.join(model_dir, "metadata.yaml")
+        self.names = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                self.names = yaml.safe_load(f).get("names", {})
+
+    def _run(self, batch):
+        return self.compiled(batch)[self.compiled.output(0)]
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend,
+}
+
+
+def load_backend(name: str = None, model_path: str = None):
+    name = name or YOLO_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown YOLO_BACKEND '{name}', expected one of {', '.join(BACKENDS)}"
+        )
+    if model_path:
+        return BACKENDS[name](model_path)
+    return BACKENDS[name]()
+
+
+def export_model(
+    export_format: str = "onnx",
+    int8: bool = False,
+    model_path: str = YOLO_MODEL_PATH,
+    data: str = None,
+) -> str:
+    """
+    Export the PyTorch weights for a CPU backend and return the exported path.
+    ONNX INT8 uses onnxruntime dynamic weight quantization; OpenVINO INT8 uses
+    Ultralytics' NNCF post-training quantization, calibrated on `data`.
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(model_path)
+    if export_format == "openvino":
+        options = {"data": data} if int8 and data else {}
+        return model.export(
+            format="openvino", imgsz=YOLO_IMG_SIZE, dynamic=True, int8=int8, **options
+        )
+
+    exported = model.export(format="onnx", imgsz=YOLO_IMG_SIZE, dynamic=True)
+    if not int8:
+        return exported
+
+    import onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantized = exported.replace(".onnx", ".int8.onnx")
+    quantize_dynamic(exported, quantized, weight_type=QuantType.QUInt8)
+
+    # Keep the class names and export metadata Ultralytics stored on the graph
+    source, target = onnx.load(exported), onnx.load(quantized)
+    del target.metadata_props[:]
+    target.metadata_props.extend(source.metadata_props)
+    onnx.save(target, quantized)
+    return quantized
@@ -0,0 +1,105 @@
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent submissions for up to `max_wait_ms` or `max_batch_size`
+    items, hands them to `process_batch` as one list and routes each result
+    back to its caller.
+
+    `process_batch` is an async callable taking a list of items and returning a
+    list of results in the same order. A result that is an Exception instance is
+    raised to that item's caller only.
+    """
+
+    def __init__(self, process_batch, max_batch_size: int = 8, max_wait_ms: float = 5):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self._queue = None
+        self._runner = None
+        self._dispatches = set()
+        self.stats = {
+            "batches": 0,
+            "items": 0,
+            "maxBatchSeen": 0,
+        }
+
+    def _ensure_started(self):
+        if self._runner is None or self._runner.done():
+            self._queue = asyncio.Queue()
+            self._runner = asyncio.create_task(self._run())
+
+    async def submit(self, item):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    # Still take anything that is already waiting
+                    if self._queue.empty():
+                        break
+                    batch.append(self._queue.get_nowait())
+                    continue
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Callers that gave up while we were gathering don't need a slot
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            # Dispatch without waiting so the next batch can gather meanwhile;
+            # the pool's own concurrency limit applies back-pressure.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        self.stats["maxBatchSeen"] = max(self.stats["maxBatchSeen"], len(batch))
+
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self):
+        batches = self.stats["batches"]
+        return {
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait * 1000,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "avgBatchSize": round(self.stats["items"] / batches, 2) if batches else 0,
+            **self.stats,
+        }
+
+    async def close(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+        for task in list(self._dispatches):
+            task.cancel()
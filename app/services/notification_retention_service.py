@@ -0,0 +1,169 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.notification_model import Notification, NotificationArchive
+
+load_dotenv()
+
+# Read notifications older than this are moved out of the hot table
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "30"))
+# "archive" copies rows to notifications_archive before deleting, "delete" drops them
+NOTIFICATION_RETENTION_MODE = os.getenv("NOTIFICATION_RETENTION_MODE", "archive")
+RETENTION_MODES = ("archive", "delete")
+# A typo must not silently turn archiving into hard deletes
+if NOTIFICATION_RETENTION_MODE not in RETENTION_MODES:
+    raise ValueError(
+        f"NOTIFICATION_RETENTION_MODE must be one of {RETENTION_MODES}, "
+        f"got {NOTIFICATION_RETENTION_MODE!r}"
+    )
+# Rows per transaction; small batches keep row locks short
+NOTIFICATION_RETENTION_BATCH_SIZE = int(
+    os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "500")
+)
+# Seconds to sleep between batches so live traffic can get at the table
+NOTIFICATION_RETENTION_PAUSE = float(os.getenv("NOTIFICATION_RETENTION_PAUSE", "0.5"))
+
+# Progress of the current/last run, for logs and inspection
+retention_stats = {
+    "running": False,
+    "startedAt": None,
+    "finishedAt": None,
+    "cutoff": None,
+    "mode": NOTIFICATION_RETENTION_MODE,
+    "batches": 0,
+    "moved": 0,
+    "remaining": None,
+}
+
+ARCHIVE_COLUMNS = [
+    "id",
+    "userId",
+    "productName",
+    "message",
+    "type",
+    "read",
+    "created_at",
+]
+
+
+def move_notification_batch(
+    db: Session, cutoff: str, batch_size: int, mode: str
+) -> int:
+    """
+    Archive (or delete) one batch of read notifications created before cutoff.
+    Runs in its own short transaction. Returns the number of rows moved.
+    """
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"Unknown notification retention mode {mode!r}")
+
+    ids = [
+        row.id
+        for row in db.query(Notification.id)
+        .filter(Notification.read == True, Notification.created_at < cutoff)
+        .order_by(Notification.created_at)
+        .limit(batch_size)
+        .all()
+    ]
+    if not ids:
+        return 0
+
+    try:
+        if mode == "archive":
+            archived_at = datetime.utcnow().isoformat()
+            db.execute(
+                insert(NotificationArchive).from_select(
+                    ARCHIVE_COLUMNS + ["archived_at"],
+                    select(
+                        *[getattr(Notification, column) for column in ARCHIVE_COLUMNS],
+                        literal(archived_at),
+                    ).where(Notification.id.in_(ids)),
+                )
+            )
+        moved = (
+            db.query(Notification)
+            .filter(Notification.id.in_(ids))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return moved
+
+
+async def archive_read_notifications():
+    """
+    Scheduled retention job. Moves read notifications older than
+    NOTIFICATION_RETENTION_DAYS out of `notifications` in small batches,
+    pausing between them, and reports progress as it goes.
+    """
+    if retention_stats["running"]:
+        print("Notification retention already running, skipping")
+        return retention_stats
+
+    db = next(get_db())
+    cutoff = (
+        datetime.utcnow() - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+    ).isoformat()
+
+    retention_stats.update(
+        {
+            "running": True,
+            "startedAt": datetime.utcnow().isoformat(),
+            "finishedAt": None,
+            "cutoff": cutoff,
+            "mode": NOTIFICATION_RETENTION_MODE,
+            "batches": 0,
+            "moved": 0,
+            "remaining": None,
+        }
+    )
+    print(
+        f"Notification retention started: mode={NOTIFICATION_RETENTION_MODE} "
+        f"cutoff={cutoff}"
+    )
+
+    # The queries are blocking, so every batch (and the final count) runs in a
+    # worker thread; the session is only ever used by one of them at a time.
+    try:
+        while True:
+            moved = await asyncio.to_thread(
+                move_notification_batch,
+                db,
+                cutoff,
+                NOTIFICATION_RETENTION_BATCH_SIZE,
+                NOTIFICATION_RETENTION_MODE,
+            )
+            if not moved:
+                break
+
+            retention_stats["batches"] += 1
+            retention_stats["moved"] += moved
+            print(
+                f"Notification retention batch {retention_stats['batches']}: "
+                f"moved {moved} (total {retention_stats['moved']})"
+            )
+            await asyncio.sleep(NOTIFICATION_RETENTION_PAUSE)
+
+        retention_stats["remaining"] = await asyncio.to_thread(
+            lambda: db.query(func.count(Notification.id)).scalar()
+        )
+        print(
+            f"Notification retention finished: moved {retention_stats['moved']} in "
+            f"{retention_stats['batches']} batches, "
+            f"{retention_stats['remaining']} rows left in notifications"
+        )
+    except Exception as e:
+        print(f"Notification retention failed: {e}")
+    finally:
+        retention_stats["running"] = False
+        retention_stats["finishedAt"] = datetime.utcnow().isoformat()
+        db.close()
+
+    return retention_stats
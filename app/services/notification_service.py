@@ -1,16 +1,27 @@
-from fastapi import WebSocket, Query, Depends
+from fastapi import WebSocket, Query, Depends, HTTPException
+from sqlalchemy import func, or_, and_
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from fastapi.websockets import WebSocketDisconnect
 
 from app.utils.jwt import decode_access_token
-
-from app.utils.jwt import decode_access_token
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import List, Optional
+from dotenv import load_dotenv
+import os
 
 from app.models.notification_model import Notification
+import base64
 import json
 
+load_dotenv()
+
+# Max unread notifications replayed per frame on connect. Unset/0 replays all of
+# them at once; otherwise the client pulls further pages with "replay_pending".
+NOTIFICATION_REPLAY_PAGE_SIZE = int(os.getenv("NOTIFICATION_REPLAY_PAGE_SIZE", "100"))
+
+notification_types = {"info": "Product_Scanned", "warning": "product_expiration"}
+
 notification_connections = {}
 
 
@@ -28,7 +39,194 @@ async def send_notification_to_user(user_id: str, message: dict):
             del notification_connections[user_id]
 
 
-async def notification_websocket(websocket: WebSocket, access_token: str = Query(None)):
+def get_pending_notifications(
+    user_id: str, db: Session, limit: Optional[int] = None
+) -> List[Notification]:
+    """
+    Fetch unread notifications for a user, oldest first.
+    Served by ix_notifications_user_read_created (userId, read, created_at).
+    """
+    query = (
+        db.query(Notification)
+        .filter(Notification.userId == user_id, Notification.read == False)
+        .order_by(Notification.created_at, Notification.id)
+    )
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+def parse_notification_timestamp(value: str) -> str:
+    """
+    Parse an ISO 8601 timestamp into the naive-UTC isoformat that created_at
+    is stored in, so string comparison on the column orders like datetimes.
+    Raises a 400 for anything that isn't a timestamp.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=400, detail="before must be an ISO 8601 timestamp"
+        )
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def mark_notifications_as_read(
+    user_id: str,
+    db: Session,
+    notification_ids: Optional[List[str]] = None,
+    before: Optional[str] = None,
+) -> int:
+    """
+    Mark a user's unread notifications as read with a single scoped UPDATE.
+    Restrict by ids and/or by created_at < before; with neither, every unread
+    notification of the user is marked. Returns the number of rows affected.
+    """
+    if notification_ids is not None and not notification_ids:
+        return 0
+    if before:
+        before = parse_notification_timestamp(before)
+
+    query = db.query(Notification).filter(
+        Notification.userId == user_id, Notification.read == False
+    )
+    if notification_ids:
+        query = query.filter(Notification.id.in_(notification_ids))
+    if before:
+        query = query.filter(Notification.created_at < before)
+
+    updated = query.update({Notification.read: True}, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def count_unread_notifications(user_id: str, db: Session) -> int:
+    """
+    Count unread notifications for a user.
+    Index-only scan on ix_notifications_user_read_created.
+    """
+    return (
+        db.query(func.count(Notification.id))
+        .filter(Notification.userId == user_id, Notification.read == False)
+        .scalar()
+    )
+
+
+def encode_notification_cursor(notification: Notification) -> str:
+    raw = f"{notification.created_at}|{notification.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("utf-8")
+
+
+def decode_notification_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("utf-8")).decode("utf-8")
+        created_at, notification_id = raw.rsplit("|", 1)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, notification_id
+
+
+def get_notification_page(
+    user_id: str, db: Session, limit: int, cursor: Optional[str] = None
+):
+    """
+    Keyset page of a user's notifications, newest first.
+    Served by ix_notifications_user_created (userId, created_at).
+    Returns (notifications, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(Notification).filter(Notification.userId == user_id)
+
+    if cursor:
+        created_at, notification_id = decode_notification_cursor(cursor)
+        query = query.filter(
+            or_(
+                Notification.created_at < created_at,
+                and_(
+                    Notification.created_at == created_at,
+                    Notification.id < notification_id,
+                ),
+            )
+        )
+
+    notifications = (
+        query.order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        next_cursor = encode_notification_cursor(notifications[-1])
+
+    return notifications, next_cursor
+
+
+def serialize_pending_notification(notification: Notification) -> dict:
+    notif_type = (
+        notification.type.value
+        if hasattr(notification.type, "value")
+        else str(notification.type)
+    )
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "type": notification_types.get(notif_type, notif_type),
+        "productName": notification.productName,
+        "expiryDate": notification.created_at,
+    }
+
+
+async def replay_pending_notifications(
+    websocket: WebSocket, user_id: str, db: Session, page_size: Optional[int] = None
+):
+    """
+    Send a page of unread notifications as one batched frame and mark exactly
+    those rows as read. One SELECT and one UPDATE per page, regardless of size.
+    """
+    if page_size is None:
+        page_size = NOTIFICATION_REPLAY_PAGE_SIZE
+
+    # Fetch one extra row to know whether another page is waiting
+    pending = get_pending_notifications(
+        user_id, db, limit=page_size + 1 if page_size else None
+    )
+    has_more = bool(page_size) and len(pending) > page_size
+    if has_more:
+        pending = pending[:page_size]
+
+    if not pending:
+        return 0
+
+    try:
+        await websocket.send_text(
+            json.dumps(
+                {
+                    "type": "PENDING_NOTIFICATIONS",
+                    "notifications": [
+                        serialize_pending_notification(notification)
+                        for notification in pending
+                    ],
+                    "hasMore": has_more,
+                }
+            )
+        )
+    except Exception as e:
+        print(f"Error replaying notifications to user {user_id}: {e}")
+        return 0
+
+    return mark_notifications_as_read(
+        user_id, db, notification_ids=[notification.id for notification in pending]
+    )
+
+
+async def notification_websocket(
+    websocket: WebSocket,
+    access_token: str = Query(None),
+    page_size: Optional[int] = None,
+):
     if not access_token:
         await websocket.close(code=1008, reason="Access token required")
 
@@ -39,46 +237,6 @@ async def notification_websocket(websocket: WebSocket, access_token: str = Query
 
     notification_connections[user_id] = websocket
     db = next(get_db())
-    # pending_notifications = (
-    #     db.query(Notification)
-    #     .filter(
-    #         Notification.userId == user_id,
-    #         Notification.read == False,  # If you have a 'read' column
-    #     )
-    #     .all()
-    # )
-    # notification_types = {"info": "Product_Scanned", "warning": "product_expiration"}
-    # for notification in pending_notifications:
-    #     notif_type = (
-    #         notification.type.value
-    #         if hasattr(notification.type, "value")
-    #         else str(notification.type)
-    #     )
-    #     try:
-    #         await websocket.send_text(
-    #             json.dumps(
-    #                 {
-    #                     "id": notification.id,
-    #                     "message": notification.message,
-    #                     "type": notification_types.get(notif_type, notif_type),
-    #                     "productName": notification.productName,
-    #                     "expiryDate": notification.created_at,
-    #                 }
-    #             )
-    #         )
-    #         notification = (
-    #             db.query(Notification)
-    #             .filter(Notification.id == notification.id)
-    #             .first()
-    #         )
-    #         if notification:
-    #             notification.read = True
-    #             db.commit()
-    #             db.refresh(notification)
-    #             print(f"Notification {notification_id} marked as read")
-    #     except Exception as e:
-    #         print(f"Error sending notification to user {user_id}: {e}")
-    #         continue
 
     await websocket.send_text(
         json.dumps(
@@ -89,11 +247,44 @@ async def notification_websocket(websocket: WebSocket, access_token: str = Query
             }
         )
     )
+    await replay_pending_notifications(websocket, user_id, db, page_size)
     try:
         while True:
             data = await websocket.receive_text()
             data_json = json.loads(data)
 
+            if data_json.get("action") == "replay_pending":
+                await replay_pending_notifications(websocket, user_id, db, page_size)
+
+            if data_json.get("action") == "mark_read_bulk" and (
+                data_json.get("ids") or data_json.get("before")
+            ):
+                ids = data_json.get("ids")
+                try:
+                    if ids is not None and not (
+                        isinstance(ids, list)
+                        and all(isinstance(id_, str) for id_ in ids)
+                    ):
+                        raise HTTPException(
+                            status_code=400, detail="ids must be a list of strings"
+                        )
+                    updated = mark_notifications_as_read(
+                        user_id,
+                        db,
+                        notification_ids=ids,
+                        before=data_json.get("before"),
+                    )
+                except HTTPException as e:
+                    await websocket.send_text(
+                        json.dumps({"type": "ERROR", "message": e.detail})
+                    )
+                else:
+                    await websocket.send_text(
+                        json.dumps(
+                            {"type": "NOTIFICATIONS_MARKED_READ", "updated": updated}
+                        )
+                    )
+
             if data_json.get("action") == "mark_read" and data_json.get("id"):
                 print("Marking notification as read")
                 notification_id = data_json["id"]
@@ -114,19 +305,22 @@ async def notification_websocket(websocket: WebSocket, access_token: str = Query
                 )
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for user {user_id}")
+    finally:
+        # Also runs when a handler above raises, so the session and the
+        # connection entry never outlive the socket
         db.close()
-        if user_id in notification_connections:
+        if notification_connections.get(user_id) is websocket:
             del notification_connections[user_id]
 
 
-async def add_notification_to_db(
+def save_notification(
     user_id: str,
     productName: str,
     message: str,
     type: str,
     db: Session,
 ):
-
+    """Blocking insert behind add_notification_to_db, for use off the event loop."""
     new_notification = Notification(
         userId=user_id,
         message=message,
@@ -140,3 +334,13 @@ async def add_notification_to_db(
     db.refresh(new_notification)
     print("Notification added to DB:", new_notification)
     return new_notification
+
+
+async def add_notification_to_db(
+    user_id: str,
+    productName: str,
+    message: str,
+    type: str,
+    db: Session,
+):
+    return save_notification(user_id, productName, message, type, db)
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.models.product_model import Product
+from app.utils.product_utils import normalize_product_name
+
+load_dotenv()
+
+PRODUCT_NAME_CACHE_MAX_ENTRIES = int(os.getenv("PRODUCT_NAME_CACHE_MAX_ENTRIES", "4096"))
+# Bounds how long a product deleted by another worker process can be served
+PRODUCT_NAME_CACHE_TTL_SECONDS = float(os.getenv("PRODUCT_NAME_CACHE_TTL_SECONDS", "60"))
+
+
+class ProductNameCache:
+    """
+    LRU + TTL map of normalized product name -> product id in front of the
+    ux_products_normalized_name lookup. Only hits are cached, so a product
+    created elsewhere is picked up on the next lookup.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = PRODUCT_NAME_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = PRODUCT_NAME_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # normalized name -> (expires_at, id)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, product_name: str, product_id: str):
+        key = normalize_product_name(product_name)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, product_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def remove(self, product_name: str):
+        with self._lock:
+            self._entries.pop(normalize_product_name(product_name), None)
+
+    def resolve(self, product_name: str, db: Session):
+        """Id of the catalog product with this name (any case/spacing), or None."""
+        key = normalize_product_name(product_name)
+        product_id = self._get(key)
+        if product_id is not None:
+            return product_id
+
+        product = (
+            db.query(Product.id).filter(Product.normalizedName == key).first()
+        )
+        if product is None:
+            return None
+        self.put(product_name, product.id)
+        return product.id
+
+    def get_stats(self):
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            **self.stats,
+        }
+
+
+product_name_cache = ProductNameCache()
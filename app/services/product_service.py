@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.services.notification_service import (
     send_notification_to_user,
@@ -10,12 +11,24 @@ from datetime import datetime
 from app.db.session import get_db
 
 from app.utils.nutrition_utils import check_nutrition_exists, fetch_nutrition
-from app.utils.product_utils import generate_product_barcode, check_existing_product
+from app.utils.product_utils import (
+    generate_product_barcode,
+    check_existing_product,
+    normalize_product_name,
+)
 from app.models.nutrition_model import Nutrition
-from app.models.user_model import User
+from app.services.user_cache import get_cached_user
 from app.models.user_product import UserProduct
 from app.models.product_model import Product
 from app.models.notification_model import Notification
+from app.services.barcode_index import barcode_index
+from app.services.product_name_cache import product_name_cache
+from app.services.catalog_matcher import catalog_matcher
+from app.services.daily_stats_service import (
+    record_product_recategorized,
+    record_product_removed,
+    record_user_product_expired,
+)
 
 
 async def check_product_expiry():
@@ -47,6 +60,7 @@ async def check_product_expiry():
         product.status = "expired"
         product.updatedAt = current_time
         db.add(product)
+        record_user_product_expired(db, product, product_details.category)
 
         # notification = Notification(
         #     userId=product.userId,
@@ -78,35 +92,8 @@ async def check_product_expiry():
     db.close()
 
 
-async def add_product_to_inventory(user_id: str, product: dict, db: Session):
-
-    # product_name = product.productName
-    # category = product.category
-    product_name = product["productName"]
-    category = product["category"]
-    product_barcode = generate_product_barcode(product_name)
-
-    if not product_name or not user_id:
-        raise HTTPException(
-            status_code=400,
-            detail="All fields are required: productName, userId, and expiryDate.",
-        )
-
-    if len(product_name) < 3:
-        raise HTTPException(
-            status_code=400, detail="Product name must be at least 3 characters long."
-        )
-
-    exists_user = db.query(User).filter_by(id=user_id).first()
-
-    if not exists_user:
-        raise HTTPException(
-            status_code=404, detail="User with the provided userId does not exist."
-        )
-
-    food_nutrition = fetch_nutrition(product_name)
-
-    nutrition_data = {
+def build_nutrition_data(food_nutrition) -> dict:
+    return {
         "energy_kcal": check_nutrition_exists("Energy (KCAL)", food_nutrition),
         "carbohydrate": check_nutrition_exists(
             "Carbohydrate, by difference (G)", food_nutrition
@@ -129,29 +116,95 @@ async def add_product_to_inventory(user_id: str, product: dict, db: Session):
         "addedAt": datetime.utcnow().isoformat(),
     }
 
-    new_nutrition = Nutrition(**nutrition_data)
-    db.add(new_nutrition)
-    db.commit()
-    db.refresh(new_nutrition)
-
-    product_data = {
-        "name": product_name,
-        "category": category,
-        "barcode": product_barcode if product_barcode else "N/A",
-        "nutritionId": new_nutrition.id,
-        "addedAt": datetime.utcnow().isoformat(),
-    }
 
-    new_product = Product(**product_data)
+def insert_product(product_name: str, category: str, db: Session):
+    """
+    Insert a catalog product and its nutrition row in one transaction.
 
+    Returns:
+        (product_id, created). When a concurrent request committed the same
+        name first, the unique name index rejects this insert and the id of
+        that product is returned with created=False.
+    """
+    product_barcode = generate_product_barcode(product_name)
+    new_nutrition = Nutrition(**build_nutrition_data(fetch_nutrition(product_name)))
+    db.add(new_nutrition)
+    # Assigns new_nutrition.id without committing
+    db.flush()
+
+    new_product = Product(
+        name=product_name,
+        normalizedName=normalize_product_name(product_name),
+        category=category,
+        barcode=product_barcode if product_barcode else "N/A",
+        nutritionId=new_nutrition.id,
+        addedAt=datetime.utcnow().isoformat(),
+    )
     db.add(new_product)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Rolls back the nutrition row too
+        db.rollback()
+        existing_id = product_name_cache.resolve(product_name, db)
+        if existing_id is None:
+            # Not a name clash (e.g. the barcode)
+            raise
+        return existing_id, False
+
     db.refresh(new_product)
+    barcode_index.put(new_product.barcode, new_product.name)
+    product_name_cache.put(new_product.name, new_product.id)
+    catalog_matcher.put(new_product.id, new_product.name)
+    return new_product.id, True
+
+
+async def add_product_to_inventory(user_id: str, product: dict, db: Session):
+    return create_product(user_id, product, db)
+
+
+def create_product(user_id: str, product: dict, db: Session):
+    """Blocking body of add_product_to_inventory, for use off the event loop."""
+    # product_name = product.productName
+    # category = product.category
+    product_name = product["productName"]
+    category = product["category"]
+
+    if not product_name or not user_id:
+        raise HTTPException(
+            status_code=400,
+            detail="All fields are required: productName, userId, and expiryDate.",
+        )
+
+    if len(product_name) < 3:
+        raise HTTPException(
+            status_code=400, detail="Product name must be at least 3 characters long."
+        )
+
+    exists_user = get_cached_user(user_id, db)
+
+    if not exists_user:
+        raise HTTPException(
+            status_code=404, detail="User with the provided userId does not exist."
+        )
+
+    # Checked before the USDA fetch; the unique index backs this up
+    if product_name_cache.resolve(product_name, db):
+        raise HTTPException(
+            status_code=409, detail=f"Product {product_name} already exists."
+        )
+
+    product_id, created = insert_product(product_name, category, db)
+    if not created:
+        # A concurrent request created it after the check above
+        raise HTTPException(
+            status_code=409, detail=f"Product {product_name} already exists."
+        )
 
     return {
         "message": "Product added successfully",
-        "productId": new_product.id,
-        "name": new_product.name.title(),
+        "productId": product_id,
+        "name": product_name.title(),
     }
 
 
@@ -224,25 +277,44 @@ async def update_inventory_product_data(product_id: str, product: dict, db: Sess
             detail="No changes detected. Please provide new values for name or category.",
         )
 
+    previous_name = existing_product.name
     existing_product.name = (
         product.get("name", "").title()
         if product.get("name", "")
         else existing_product.name
     )
+    existing_product.normalizedName = normalize_product_name(existing_product.name)
+    if existing_product.normalizedName != normalize_product_name(previous_name):
+        duplicate_id = product_name_cache.resolve(existing_product.name, db)
+        if duplicate_id and duplicate_id != product_id:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"Product {existing_product.name} already exists.",
+            )
+    previous_category = existing_product.category
     existing_product.category = (
         product.get("category", "")
         if product.get("category", "")
         else existing_product.category
     )
+    previous_barcode = existing_product.barcode
     existing_product.barcode = (
         product.get("barcode", "")
         if product.get("barcode", "")
         else existing_product.barcode
     )
     existing_product.updatedAt = datetime.utcnow().isoformat()
+    record_product_recategorized(
+        db, product_id, previous_category, existing_product.category
+    )
 
     db.commit()
     db.refresh(existing_product)
+    barcode_index.put(existing_product.barcode, existing_product.name, previous_barcode)
+    product_name_cache.remove(previous_name)
+    product_name_cache.put(existing_product.name, existing_product.id)
+    catalog_matcher.put(existing_product.id, existing_product.name, previous_name)
 
     return {product_id: existing_product.id, "name": existing_product.name.title()}
 
@@ -259,11 +331,16 @@ async def delete_inventory_product_data(product_id: str, db: Session):
 
     # Check if the product is associated with any user products
     # Delete if it exists to avoid foreign key constraint issues
+    record_product_removed(db, product_id, existing_product.category)
     db.query(UserProduct).filter(UserProduct.productId == product_id).delete()
     db.commit()
 
+    barcode, name = existing_product.barcode, existing_product.name
     db.delete(existing_product)
     db.commit()
+    barcode_index.remove(barcode)
+    product_name_cache.remove(name)
+    catalog_matcher.remove(name)
 
     return {"message": "Product deleted successfully"}
 
@@ -295,7 +372,7 @@ async def add_mass_products_to_inventory(user_id: str, products: list, db: Sessi
                 })
                 continue
 
-            exists_user = db.query(User).filter_by(id=user_id).first()
+            exists_user = get_cached_user(user_id, db)
             if not exists_user:
                 results["failed"].append({
                     "product": {"productName": product_name, "category": category},
@@ -303,44 +380,30 @@ async def add_mass_products_to_inventory(user_id: str, products: list, db: Sessi
                 })
                 continue
 
-            product_barcode = generate_product_barcode(product_name)
-            food_nutrition = fetch_nutrition(product_name)
-            nutrition_data = {
-                "energy_kcal": check_nutrition_exists("Energy (KCAL)", food_nutrition),
-                "carbohydrate": check_nutrition_exists("Carbohydrate, by difference (G)", food_nutrition),
-                "total_sugars": check_nutrition_exists("Total Sugars (G)", food_nutrition),
-                "fiber": check_nutrition_exists("Fiber, total dietary (G)", food_nutrition),
-                "protein": check_nutrition_exists("Protein (G)", food_nutrition),
-                "saturated_fat": check_nutrition_exists("Fatty acids, total saturated (G)", food_nutrition),
-                "vitamin_a": check_nutrition_exists("Vitamin A, IU (IU)", food_nutrition),
-                "vitamin_c": check_nutrition_exists("Vitamin C, total ascorbic acid (MG)", food_nutrition),
-                "potassium": check_nutrition_exists("Potassium, K (MG)", food_nutrition),
-                "iron": check_nutrition_exists("Iron, Fe (MG)", food_nutrition),
-                "calcium": check_nutrition_exists("Calcium, Ca (MG)", food_nutrition),
-                "sodium": check_nutrition_exists("Sodium, Na (MG)", food_nutrition),
-                "cholesterol": check_nutrition_exists("Cholesterol (MG)", food_nutrition),
-                "addedAt": datetime.utcnow().isoformat(),
-            }
-            new_nutrition = Nutrition(**nutrition_data)
-            db.add(new_nutrition)
-            db.commit()
-            db.refresh(new_nutrition)
-
-            product_data = {
-                "name": product_name,
-                "category": category,
-                "barcode": product_barcode if product_barcode else "N/A",
-                "nutritionId": new_nutrition.id,
-                "addedAt": datetime.utcnow().isoformat(),
-            }
-            new_product = Product(**product_data)
-            db.add(new_product)
-            db.commit()
-            db.refresh(new_product)
+            if product_name_cache.resolve(product_name, db):
+                results["failed"].append({
+                    "product": {"productName": product_name, "category": category},
+                    "reason": "Product already exists"
+                })
+                continue
+
+            product_id, created = insert_product(product_name, category, db)
+            if not created:
+                results["failed"].append({
+                    "product": {"productName": product_name, "category": category},
+                    "reason": "Product already exists"
+                })
+                continue
 
             results["success"].append({
-                "productId": new_product.id,
-                "name": new_product.name.title()
+                "productId": product_id,
+                "name": product_name.title()
+            })
+        except SQLAlchemyError:
+            db.rollback()
+            results["failed"].append({
+                "product": {"productName": product_name, "category": category},
+                "reason": "Could not save the product"
             })
         except Exception as e:
             db.rollback()
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import cv2
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.models.product_model import Product
+from app.services.user_product_service import create_user_product
+from app.utils.image_utils import decode_image
+from app.utils.product_utils import (
+    get_product_name_from_barcode,
+    get_product_shelf_life,
+    normalize_product_name,
+)
+
+load_dotenv()
+
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="scan")
+
+# OpenCV detectors aren't thread-safe but are costly to build, so each scan
+# thread keeps its own pair.
+_detectors = threading.local()
+
+
+def _get_qr_detector():
+    if not hasattr(_detectors, "qr"):
+        _detectors.qr = cv2.QRCodeDetector()
+    return _detectors.qr
+
+
+def _get_barcode_detector():
+    if not hasattr(_detectors, "barcode"):
+        # 1D barcodes need OpenCV >= 4.8 (or opencv-contrib before that)
+        barcode_module = getattr(cv2, "barcode", None)
+        _detectors.barcode = (
+            barcode_module.BarcodeDetector() if barcode_module else None
+        )
+    return _detectors.barcode
+
+
+def _decode_barcodes(img):
+    detector = _get_barcode_detector()
+    if detector is None:
+        return []
+
+    if hasattr(detector, "detectAndDecodeWithType"):
+        ok, values, types, _ = detector.detectAndDecodeWithType(img)
+    else:
+        ok, values, types, _ = detector.detectAndDecode(img)
+    if not ok:
+        return []
+    return [
+        {"format": "BARCODE", "symbology": str(symbology), "data": value}
+        for value, symbology in zip(values, types)
+        if value
+    ]
+
+
+def decode_codes(image_bytes: bytes) -> list:
+    """QR and 1D barcodes found in an encoded image, decoded fully in memory."""
+    img = decode_image(image_bytes)
+
+    codes = []
+    data, bbox, _ = _get_qr_detector().detectAndDecode(img)
+    if bbox is not None and data:
+        codes.append({"format": "QR", "symbology": "QR_CODE", "data": data})
+
+    codes.extend(_decode_barcodes(img))
+    return codes
+
+
+async def scan_codes(image_bytes: bytes) -> list:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, decode_codes, image_bytes)
+
+
+def resolve_product(code: str, db: Session):
+    """Product name for a scanned code, by barcode first and then by name."""
+    product_name = get_product_name_from_barcode(code, db)
+    if product_name:
+        return product_name
+
+    product = (
+        db.query(Product.name)
+        .filter(Product.normalizedName == normalize_product_name(code))
+        .first()
+    )
+    return product.name if product else None
+
+
+def match_codes(codes: list, db: Session):
+    """(product name, code) for the first code that resolves, or (None, None)."""
+    for code in codes:
+        product_name = resolve_product(code["data"], db)
+        if product_name:
+            return product_name, code
+    return None, None
+
+
+async def resolve_scan(user_id: str, codes: list, add: bool, db: Session):
+    """Match scanned codes to a product and optionally add it to the inventory."""
+    if not codes:
+        return {"error": "No QR code found in the image", "codes": []}
+
+    # Blocking lookups; create_user_product below keeps its own DB work off
+    # the event loop as well
+    product_name, matched = await run_in_threadpool(match_codes, codes, db)
+
+    result = {
+        "message": "QR Scanned successfully",
+        "data": codes[0]["data"],
+        "codes": codes,
+        "product": {"name": product_name, "code": matched["data"]}
+        if matched
+        else None,
+        "added": None,
+    }
+
+    if add and matched:
+        shelf_life = get_product_shelf_life(product_name)
+        result["added"] = await create_user_product(
+            user_id=user_id,
+            product_name=product_name,
+            quantity=1,
+            expiry_date=(datetime.utcnow() + timedelta(days=shelf_life)).isoformat(),
+            notes=f"Scanned Via {matched['format'].title()} with Code {matched['data']}",
+            is_scanned_product=True,
+            db=db,
+        )
+    return result
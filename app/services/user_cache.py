@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User
+
+load_dotenv()
+
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+# Key in Session.info for the per-request layer; get_db hands out one
+# session per request, so this lives exactly as long as the request
+_SESSION_KEY = "user_cache"
+
+
+class UserCache:
+    """
+    Profile snapshots (no password hash) by user id, in two layers: the
+    request's session and a short-TTL process LRU. Only existing users are
+    cached, so a new signup is visible immediately. Updates and deletes of a
+    User row evict it through mapper events.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = USER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = USER_CACHE_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # user id -> (expires_at, snapshot)
+        self._lock = threading.Lock()
+        self.stats = {"requestHits": 0, "hits": 0, "misses": 0}
+
+    @staticmethod
+    def _snapshot(user: User) -> dict:
+        return {
+            "id": user.id,
+            "name": user.name,
+            "dob": user.dob,
+            "email": user.email,
+            "createdAt": user.created_at,
+            "updatedAt": user.updated_at,
+        }
+
+    def get(self, user_id: str, db: Session):
+        """Snapshot of the user, or None if no such user exists."""
+        request_cache = db.info.setdefault(_SESSION_KEY, {})
+        if user_id in request_cache:
+            self.stats["requestHits"] += 1
+            return request_cache[user_id]
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                request_cache[user_id] = entry[1]
+                return entry[1]
+            self.stats["misses"] += 1
+
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+
+        snapshot = self._snapshot(user)
+        request_cache[user_id] = snapshot
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id: str, db: Session = None):
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if db is not None:
+            db.info.get(_SESSION_KEY, {}).pop(user_id, None)
+
+    def get_stats(self):
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            **self.stats,
+        }
+
+
+user_cache = UserCache()
+
+
+def get_cached_user(user_id: str, db: Session):
+    return user_cache.get(user_id, db)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target):
+    user_cache.invalidate(target.id, Session.object_session(target))
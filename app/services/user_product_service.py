@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from app.models.user_product import UserProduct
-from app.models.user_model import User
+from app.services.user_cache import get_cached_user
 from app.models.product_model import Product
 from app.models.nutrition_model import Nutrition
 
@@ -9,21 +10,31 @@ from app.utils.product_utils import check_user_product_exists
 from datetime import datetime
 from app.services.notification_service import (
     send_notification_to_user,
-    add_notification_to_db,
+    save_notification,
+)
+from app.services.product_service import create_product
+from app.services.product_name_cache import product_name_cache
+from app.services.catalog_matcher import catalog_matcher
+from app.services.daily_stats_service import (
+    record_user_product_added,
+    record_user_product_moved,
+    record_user_product_removed,
 )
-from app.services.product_service import add_product_to_inventory
 
 
-async def create_user_product(
+def insert_user_product(
     user_id: str,
     product_name: str,
     quantity: int,
     expiry_date: str,
     notes: str,
-    is_scanned_product: bool,
     db: Session,
 ):
-    exists_user = db.query(User).filter_by(id=user_id).first()
+    """
+    Blocking part of create_user_product: resolve (or create) the catalog
+    product and insert the user's row. Returns (user product, product name).
+    """
+    exists_user = get_cached_user(user_id, db)
 
     if not exists_user:
         raise HTTPException(
@@ -36,22 +47,28 @@ async def create_user_product(
     #         detail="All fields are required: name, quantity, and expiryDate.",
     #     )
 
-    product_exists = db.query(Product).filter(Product.name == product_name).first()
-
-    if not product_exists:
+    # Cached, case-insensitive name -> id resolution over the normalized index
+    product_id = product_name_cache.resolve(product_name, db)
 
-        # If product does not exist, create it
-        await add_product_to_inventory(
-            user_id, {"productName": product_name, "category": "Uncategorized"}, db
-        )
-        # Query again to get the newly created product
-        product_exists = db.query(Product).filter(Product.name == product_name).first()
+    if not product_id:
+        # Near-misses ("Bananas", "tomatoe") reuse the existing product
+        match = catalog_matcher.match_product(product_name)
+        if match:
+            product_id, product_name = match["productId"], match["name"]
 
-    if product_exists:
-        # Refresh to retrieve the newly created product data (id, nutrients)
-        db.refresh(product_exists)
+    if not product_id:
 
-    product_id = product_exists.id if product_exists else None
+        # If product does not exist, create it
+        try:
+            created_product = create_product(
+                user_id, {"productName": product_name, "category": "Uncategorized"}, db
+            )
+            product_id = created_product["productId"]
+        except HTTPException as e:
+            if e.status_code != 409:
+                raise
+            # Created by a concurrent request in the meantime; use that one
+            product_id = product_name_cache.resolve(product_name, db)
 
     new_product = {
         "userId": user_id,
@@ -66,16 +83,43 @@ async def create_user_product(
 
     new_user_product = UserProduct(**new_product)
     db.add(new_user_product)
+    record_user_product_added(db, new_user_product)
     db.commit()
     db.refresh(new_user_product)
+    return new_user_product, product_name
+
+
+def get_product_nutrition(product_id: str, db: Session):
+    return (
+        db.query(Nutrition)
+        .join(Product, Product.nutritionId == Nutrition.id)
+        .filter(Product.id == product_id)
+        .first()
+    )
+
+
+async def create_user_product(
+    user_id: str,
+    product_name: str,
+    quantity: int,
+    expiry_date: str,
+    notes: str,
+    is_scanned_product: bool,
+    db: Session,
+):
+    # The queries and commits run in the threadpool; only the WebSocket
+    # notification has to happen on the event loop
+    new_user_product, product_name = await run_in_threadpool(
+        insert_user_product, user_id, product_name, quantity, expiry_date, notes, db
+    )
+    product_id = new_user_product.productId
 
     if is_scanned_product:
-        product_nutrition = (
-            db.query(Nutrition)
-            .filter(Nutrition.id == product_exists.nutritionId)
-            .first()
+        product_nutrition = await run_in_threadpool(
+            get_product_nutrition, product_id, db
         )
-        await add_notification_to_db(
+        await run_in_threadpool(
+            save_notification,
             user_id=user_id,
             message="Product Scanned successfully",
             productName=product_name,
@@ -117,7 +161,7 @@ async def create_user_product(
 
     return {
         "message": "New Product added to user inventory successfully",
-        "productId": new_user_product.productId,
+        "productId": product_id,
         "name": product_name,
         "quantity": quantity,
         "expiryDate": expiry_date,
@@ -220,6 +264,7 @@ async def update_user_product_data(
             detail="No changes detected. Please provide new values for quantity or expiryDate.",
         )
 
+    previous_expiry_date = existing_user_product.expiryDate
     existing_user_product.quantity = (
         product.get("quantity")
         if product.get("quantity")
@@ -235,6 +280,7 @@ async def update_user_product_data(
     )
 
     existing_user_product.updatedAt = datetime.utcnow().isoformat()
+    record_user_product_moved(db, existing_user_product, previous_expiry_date)
 
     db.commit()
     db.refresh(existing_user_product)
@@ -257,6 +303,7 @@ async def delete_user_product_data(user_id: str, product_id: str, db: Session):
             detail=f"Product with ID {product_id} does not exist in user inventory.",
         )
 
+    record_user_product_removed(db, existing_user_product)
     db.delete(existing_user_product)
     db.commit()
 
@@ -275,7 +322,7 @@ async def add_mass_user_products(
     """
     results = {"success": [], "failed": []}
 
-    exists_user = db.query(User).filter_by(id=user_id).first()
+    exists_user = get_cached_user(user_id, db)
     if not exists_user:
         return {"success": [], "failed": [{"reason": "User does not exist"}]}
 
@@ -1,99 +1,190 @@
-from ultralytics import YOLO
 import cv2
 import numpy as np
 import os
-from cloudinary.uploader import upload
-import cloudinary
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
+from app.services.inference_backends import YOLO_IMG_SIZE, load_backend
+from app.utils.image_utils import decode_image_bounded, letterbox, scale_boxes
 
 # Load environment variables
 load_dotenv()
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    secure=True,
-)
+# "preload" loads (and warms up) the model when the worker starts,
+# "lazy" defers it to the first detection.
+YOLO_MODEL_LOAD = os.getenv("YOLO_MODEL_LOAD", "preload")
+YOLO_WARMUP = os.getenv("YOLO_WARMUP", "true").lower() == "true"
 
-model = YOLO("best.pt")
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-
-
-def get_average_color(image):
-    if image.size == 0:
-        return None
-    return np.mean(image, axis=(0, 1))
-
-
-def detect_objects(file_path: str):
-    img = cv2.imread(file_path)
-    if img is None:
-        raise ValueError(f"Could not load image at {file_path}")
-    results = model.predict(source=img, conf=0.25)
-
-    detections = []
-    for result in results:
-        boxes = result.boxes
-        names = model.names
-
-        if boxes is not None and len(boxes) > 0:
-            for box in boxes:
-                cls_id = int(box.cls[0])
-                conf = float(box.conf[0])
-                x1, y1, x2, y2 = map(int, box.xyxy[0])
-
-                cropped = img[y1:y2, x1:x2]
-                avg_color = get_average_color(cropped)
-                if avg_color is not None:
-                    avg_color_rgb = [int(c) for c in avg_color[::-1]]  # BGR → RGB
-                else:
-                    avg_color_rgb = None
-
-                detections.append(
-                    {
-                        "name": names[cls_id],
-                        "confidence": conf,
-                        "bbox": [x1, y1, x2, y2],
-                        "avg_color_rgb": avg_color_rgb,
-                    }
-                )
+_model = None
+_model_lock = threading.Lock()
 
-                # Draw bounding box and label
-                label = f"{names[cls_id]} {conf:.2f}"
-                cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                cv2.putText(
-                    img,
-                    label,
-                    (x1, y1 - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    2,
-                    (0, 255, 0),
-                    8,
-                )
+model_state = {
+    "loaded": False,
+    "warmedUp": False,
+    "loadSeconds": None,
+    "warmupSeconds": None,
+    "pid": os.getpid(),
+}
+
+UPLOAD_FOLDER = "uploads"
+# Debug only: also write each upload to UPLOAD_FOLDER
+YOLO_KEEP_UPLOADS = os.getenv("YOLO_KEEP_UPLOADS", "false").lower() == "true"
+if YOLO_KEEP_UPLOADS:
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+
+def get_model():
+    """The inference backend (picked by YOLO_BACKEND), loaded on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                _model = load_backend()
+                model_state["loadSeconds"] = round(time.perf_counter() - started, 3)
+                model_state["loaded"] = True
+    return _model
+
+
+def warm_up_model():
+    """
+    Run one dummy inference so lazy allocations, kernel selection and graph
+    compilation happen now instead of on the first real request.
+    """
+    if model_state["warmedUp"]:
+        return
+    started = time.perf_counter()
+    blank = np.full((YOLO_IMG_SIZE, YOLO_IMG_SIZE, 3), 114, dtype=np.uint8)
+    get_model().predict([blank])
+    model_state["warmupSeconds"] = round(time.perf_counter() - started, 3)
+    model_state["warmedUp"] = True
+
+
+def load_model(warm_up: bool = YOLO_WARMUP):
+    get_model()
+    if warm_up:
+        warm_up_model()
+    model_state["pid"] = os.getpid()
+    return dict(model_state)
+
+
+def get_average_colors(image, boxes):
+    """
+    Mean BGR colour inside each of the (N, 4) integer xyxy boxes, computed from
+    one summed-area table instead of a crop + np.mean per box.
+    Rows for empty boxes are NaN.
+    """
+    height, width = image.shape[:2]
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    x1, y1, x2, y2 = boxes.T
+
+    integral = cv2.integral(image, sdepth=cv2.CV_64F)  # (H + 1, W + 1, C)
+    sums = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+    areas = ((x2 - x1) * (y2 - y1)).astype(np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / areas[:, None]
+    means[areas <= 0] = np.nan
+    return means
+
+
+def save_debug_image(name: str, data: bytes):
+    with open(os.path.join(UPLOAD_FOLDER, name), "wb") as f:
+        f.write(data)
+
+
+def build_detection_response(img, result, scale: float = 1.0):
+    """
+    img is the reduced decode the boxes refer to; scale maps its pixels back to
+    the original upload, which is what the reported bbox uses.
+    """
+    xyxy, confs, classes = result
+    names = get_model().names
 
     # If no detections found, you can handle it
-    if not detections:
+    if len(xyxy) == 0:
         return {
             "detections": [],
             "message": "No objects detected",
             "annotated_image_url": None,
         }
 
-    # Get the highest confidence detection
-    highest_confidence_detection = max(detections, key=lambda d: d["confidence"])
-
-    # Save the annotated image to a temporary file
-    annotated_image_path = os.path.join(UPLOAD_FOLDER, "annotated_image.jpg")
-    cv2.imwrite(annotated_image_path, img)
+    boxes = xyxy.astype(np.int64)
+    bboxes = np.round(xyxy * scale).astype(np.int64).tolist()
+    # BGR → RGB, truncated to ints like the per-crop mean used to be
+    avg_colors = get_average_colors(img, boxes)[:, ::-1]
+
+    detections = [
+        {
+            "name": names[cls_id],
+            "confidence": conf,
+            "bbox": bbox,
+            "avg_color_rgb": (
+                None if np.isnan(avg_color).any() else avg_color.astype(int).tolist()
+            ),
+        }
+        for cls_id, conf, bbox, avg_color in zip(
+            classes.tolist(), confs.tolist(), bboxes, avg_colors
+        )
+    ]
 
-    # Upload the annotated image to Cloudinary
-    upload_result = upload(annotated_image_path)
-    annotated_image_url = upload_result.get("secure_url")
+    # Get the highest confidence detection
+    highest_confidence_detection = detections[int(np.argmax(confs))]
 
+    # The annotated image is rendered and stored off the request path
+    # (see annotation_service), so the URL is filled in later.
     return {
         "detection": highest_confidence_detection,
-        "annotated_image_url": annotated_image_url,
+        "detections": detections,
+        "annotated_image_url": None,
     }
+
+
+def detect_objects_batch(images: list):
+    """
+    Run one batched predict over several encoded images (raw upload bytes).
+    Returns one entry per input, in order: the detection response, or the
+    exception raised for that image so a bad upload doesn't fail the batch.
+    """
+    responses = [None] * len(images)
+    decoded = []
+    inputs = []
+    positions = []
+    for position, image_bytes in enumerate(images):
+        if YOLO_KEEP_UPLOADS:
+            save_debug_image(f"{uuid.uuid4().hex}_upload.jpg", image_bytes)
+        try:
+            # Reduced decode, then letterbox once to the model's input size
+            img, scale = decode_image_bounded(image_bytes, YOLO_IMG_SIZE)
+            padded, ratio, pad = letterbox(img, YOLO_IMG_SIZE)
+            decoded.append((img, scale, ratio, pad))
+            inputs.append(padded)
+            positions.append(position)
+        except Exception as e:
+            responses[position] = e
+
+    if inputs:
+        results = get_model().predict(inputs)
+        for position, (img, scale, ratio, pad), (xyxy, conf, cls) in zip(
+            positions, decoded, results
+        ):
+            try:
+                # Letterbox coordinates -> decoded image -> original upload
+                boxes = scale_boxes(xyxy, ratio, pad, img.shape)
+                responses[position] = build_detection_response(
+                    img, (boxes, conf, cls), scale
+                )
+            except Exception as e:
+                responses[position] = e
+
+    return responses
+
+
+def detect_objects(image_bytes: bytes):
+    response = detect_objects_batch([image_bytes])[0]
+    if isinstance(response, Exception):
+        raise response
+    return response
@@ -6,3 +6,26 @@ class AuthError(HTTPException):
         self, detail="Authentication failed", status_code=status.HTTP_401_UNAUTHORIZED
     ):
         super().__init__(status_code=status_code, detail=detail)
+
+
+class PayloadTooLargeError(HTTPException):
+    def __init__(
+        self,
+        detail="Uploaded file is too large",
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    ):
+        super().__init__(status_code=status_code, detail=detail)
+
+
+class ServiceOverloadedError(HTTPException):
+    def __init__(
+        self,
+        detail="Server is busy, please retry shortly.",
+        retry_after: int = 1,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    ):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
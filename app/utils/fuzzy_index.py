@@ -0,0 +1,64 @@
+from collections import defaultdict
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a normalized string, padded so short words count."""
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigram to entries. A search only scores entries that
+    share at least one trigram with the query, so a lookup costs a few posting
+    lists instead of a pass over the whole catalog.
+
+    Scores are the Dice coefficient of the two trigram sets, from 0 to 1.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> (trigram set, payload)
+        self._postings = defaultdict(set)  # trigram -> keys
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key: str, payload=None):
+        if key in self._entries:
+            self.remove(key)
+        grams = trigrams(key)
+        self._entries[key] = (grams, payload)
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in entry[0]:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.0):
+        """Best matches as (key, payload, score), highest score first."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared = defaultdict(int)
+        for gram in query_grams:
+            for key in self._postings.get(gram, ()):
+                shared[key] += 1
+
+        matches = []
+        for key, count in shared.items():
+            grams, payload = self._entries[key]
+            score = 2 * count / (len(query_grams) + len(grams))
+            if score >= min_score:
+                matches.append((key, payload, round(score, 4)))
+
+        matches.sort(key=lambda match: match[2], reverse=True)
+        return matches[:limit]
@@ -0,0 +1,153 @@
+import io
+
+import cv2
+import numpy as np
+
+# JPEG decoders can scale by 1/2, 1/4 or 1/8 during the DCT, which is far
+# cheaper than decoding at full size and resizing afterwards.
+REDUCED_COLOR_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+class ImageTooLargeError(ValueError):
+    """The header declares more pixels than PIL will open (a decompression bomb)."""
+
+
+def decode_image(image_bytes: bytes):
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode the uploaded image")
+    return img
+
+
+def read_image_size(image_bytes: bytes):
+    """
+    (width, height) from the image header without decoding pixels, or None if
+    it can't be read. Raises ImageTooLargeError for images PIL rejects as
+    decompression bombs, so they aren't mistaken for an unreadable header.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return img.size
+    except Image.DecompressionBombError as e:
+        raise ImageTooLargeError(str(e)) from e
+    except Exception:
+        return None
+
+
+def decode_image_bounded(image_bytes: bytes, min_side: int = 640):
+    """
+    Decode at the smallest 1/2, 1/4 or 1/8 reduction whose longest side is still
+    at least min_side, so a 12 MP photo never lands in memory at full size.
+
+    Returns:
+        (image, scale) where scale maps decoded pixels back to original pixels.
+    """
+    factor = 1
+    size = read_image_size(image_bytes)
+    if size:
+        longest = max(size)
+        for candidate in REDUCED_COLOR_FLAGS:
+            if longest / candidate >= min_side:
+                factor = candidate
+                break
+
+    img = cv2.imdecode(
+        np.frombuffer(image_bytes, np.uint8),
+        REDUCED_COLOR_FLAGS.get(factor, cv2.IMREAD_COLOR),
+    )
+    if img is None:
+        raise ValueError("Could not decode the uploaded image")
+
+    # Compare longest sides so EXIF rotation applied by imdecode doesn't matter
+    scale = max(size) / max(img.shape[:2]) if size else 1.0
+    return img, scale
+
+
+def dhash(image_bytes: bytes, hash_size: int = 8):
+    """
+    Difference hash of an encoded image as a hash_size**2-bit int, or None if it
+    can't be decoded. JPEGs are decoded at 1/8 scale, which is all a 9x8
+    thumbnail needs.
+    """
+    img = cv2.imdecode(
+        np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8
+    )
+    if img is None:
+        return None
+    small = cv2.resize(img, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def encode_jpeg(img) -> bytes:
+    ok, encoded = cv2.imencode(".jpg", img)
+    if not ok:
+        raise ValueError("Could not encode image as JPEG")
+    return encoded.tobytes()
+
+
+def draw_detections(img, detections: list, scale: float = 1.0):
+    """
+    Draw each detection's bounding box and label onto img in place. Boxes are in
+    original-image pixels; scale is the one returned by decode_image_bounded.
+    """
+    for detection in detections:
+        x1, y1, x2, y2 = [int(round(v / scale)) for v in detection["bbox"]]
+        label = f"{detection['name']} {detection['confidence']:.2f}"
+        cv2.rectangle(img, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(
+            img,
+            label,
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            2,
+            (0, 255, 0),
+            8,
+        )
+    return img
+
+
+def letterbox(img, new_shape: int = 640, color=(114, 114, 114)):
+    """
+    Resize keeping aspect ratio and pad to a square `new_shape` canvas, the way
+    YOLO models expect their input.
+
+    Returns:
+        (padded_image, ratio, (pad_x, pad_y))
+    """
+    height, width = img.shape[:2]
+    ratio = min(new_shape / height, new_shape / width)
+    resized_w, resized_h = int(round(width * ratio)), int(round(height * ratio))
+
+    if (resized_w, resized_h) != (width, height):
+        img = cv2.resize(img, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (new_shape - resized_w) / 2
+    pad_y = (new_shape - resized_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    img = cv2.copyMakeBorder(
+        img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color
+    )
+    return img, ratio, (left, top)
+
+
+def scale_boxes(xyxy, ratio: float, pad, original_shape):
+    """
+    Map (N, 4) xyxy boxes from letterboxed coordinates back onto the image
+    they were letterboxed from, clipped to its bounds.
+    """
+    boxes = np.asarray(xyxy, dtype=np.float32).copy()
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= ratio
+    height, width = original_shape[:2]
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+    return boxes
@@ -1,5 +1,6 @@
 import hashlib
 from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
 from app.models.product_model import Product
 from app.models.user_product import UserProduct
 
@@ -82,10 +83,17 @@ SHELF_LIFE_MAP = {
 }
 
 
+def normalize_product_name(product_name: str) -> str:
+    """Catalog key for a product name: lowercased with whitespace collapsed."""
+    return " ".join(product_name.split()).lower()
+
+
 def generate_product_barcode(product_name: str) -> str:
     """
     Generates a simple barcode for a product based on its name.
     Uses a predefined mapping for known products. For test purposes.
+    This only assigns a barcode to a new product; once stored on the product,
+    barcodes are resolved through the barcode index, not this map.
     Params:
         product_name (str): The name of the product.
 
@@ -105,21 +113,23 @@ def generate_product_barcode(product_name: str) -> str:
 def get_product_name_from_barcode(barcode: str, db: Session = None) -> str:
     """
     Retrieves the product name from a given barcode.
-    Uses a predefined mapping for known products. For test purposes.
+    Served from the in-memory barcode index, falling back to the database.
     Params:
         barcode (str): The barcode of the product.
 
     Returns:
-        str: The name of the product or "Unknown Product" if not found.
+        str: The name of the product or None if not found.
     """
-    if not db:
-        db = next(get_db())
-    product = db.query(Product).filter(Product.barcode == barcode).first()
-
-    if product:
-        return product.name
-    else:
-        return None
+    from app.services.barcode_index import barcode_index
+
+    if db is not None:
+        return barcode_index.lookup(barcode, db)
+
+    db = SessionLocal()
+    try:
+        return barcode_index.lookup(barcode, db)
+    finally:
+        db.close()
 
 
 def check_existing_product(product_id: str, db: Session):
@@ -0,0 +1,136 @@
+"""
+Per-request overhead of the auth layer: the old @app.middleware("http")
+version (BaseHTTPMiddleware + jwt.decode on every call) against the pure ASGI
+AccessTokenMiddleware with its claims cache.
+
+Usage:
+    SECRET_KEY=bench python -m scripts.benchmark_auth_middleware --requests 20000
+
+Requests are driven straight through the ASGI callable, so the numbers are
+middleware + routing cost only, with no server or socket in the way.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core.auth import AccessTokenMiddleware, TokenClaimsCache  # noqa: E402
+from app.utils.jwt import create_access_token, decode_access_token  # noqa: E402
+
+
+def _build_app():
+    app = FastAPI(root_path="/api")
+
+    @app.get("/user/profile")
+    async def profile(request: Request):
+        return {"userId": request.state.user.get("userId")}
+
+    return app
+
+
+def build_legacy_app():
+    app = _build_app()
+
+    @app.middleware("http")
+    async def access_token_middleware(request: Request, call_next):
+        public_paths = [
+            "/api/auth/login",
+            "/api/auth/signup",
+            "/api/status",
+            "/docs",
+            "/redoc",
+            "/api/openapi.json",
+        ]
+        if request.url.path in public_paths:
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header:
+            return JSONResponse(status_code=401, content={"detail": "missing"})
+        payload = decode_access_token(auth_header.split("Bearer ")[-1].strip())
+        if not payload:
+            return JSONResponse(status_code=401, content={"detail": "invalid"})
+        request.state.user = payload
+        return await call_next(request)
+
+    return app
+
+
+def build_asgi_app():
+    app = _build_app()
+    app.add_middleware(AccessTokenMiddleware, cache=TokenClaimsCache())
+    return app
+
+
+async def _call(app, token: str):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/user/profile",
+        "raw_path": b"/user/profile",
+        "root_path": "/api",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status["code"]
+
+
+async def _bench(app, token: str, requests: int):
+    # Warm-up (route compilation, first decode into the cache)
+    for _ in range(100):
+        assert await _call(app, token) == 200
+
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await _call(app, token)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"userId": "benchmark-user", "email": "b@x.io"})
+    for name, app in (
+        ("legacy BaseHTTPMiddleware", build_legacy_app()),
+        ("pure ASGI + claims cache", build_asgi_app()),
+    ):
+        result = asyncio.run(_bench(app, token, args.requests))
+        print(
+            f"{name:28s} mean {result['mean_us']:8.1f} us  "
+            f"p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Compare YOLO inference backends on CPU: latency, memory and accuracy drift
+against the PyTorch (ultralytics) path.
+
+Usage:
+    python -m scripts.benchmark_yolo_backends --images samples/ \\
+        --backend ultralytics:best.pt \\
+        --backend onnxruntime:best.onnx \\
+        --backend onnxruntime:best.int8.onnx \\
+        --backend openvino:best_openvino_model
+
+Each backend runs in its own spawned process so RSS numbers are not polluted
+by the others. The first --backend is the accuracy reference.
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def _rss_mb():
+    import psutil
+
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def _run_backend(spec, image_paths, runs, batch_size):
+    from app.services.inference_backends import load_backend
+
+    name, _, path = spec.partition(":")
+    images = [cv2.imread(p) for p in image_paths]
+
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    backend = load_backend(name, path or None)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = _rss_mb()
+
+    # Warm-up so lazy allocations and graph compilation don't skew latency
+    backend.predict(images[:batch_size])
+
+    latencies = []
+    detections = []
+    for run in range(runs):
+        for i in range(0, len(images), batch_size):
+            batch = images[i : i + batch_size]
+            started = time.perf_counter()
+            output = backend.predict(batch)
+            latencies.append((time.perf_counter() - started) * 1000 / len(batch))
+            if run == 0:
+                detections.extend(output)
+
+    latencies.sort()
+    return {
+        "backend": spec,
+        "loadSeconds": round(load_seconds, 2),
+        "modelRssMb": round(rss_loaded - rss_before, 1),
+        "peakRssMb": round(_rss_mb(), 1),
+        "p50Ms": round(statistics.median(latencies), 2),
+        "p95Ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "detections": [
+            (xyxy.tolist(), conf.tolist(), cls.tolist())
+            for xyxy, conf, cls in detections
+        ],
+    }
+
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, x2 - x1) * max(0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0
+
+
+def accuracy_drift(reference, candidate, iou_threshold=0.5):
+    """Greedy same-class matching of candidate boxes onto reference boxes."""
+    matched, total_ref, total_cand = 0, 0, 0
+    ious, conf_deltas = [], []
+    for (ref_boxes, ref_conf, ref_cls), (boxes, conf, cls) in zip(
+        reference, candidate
+    ):
+        total_ref += len(ref_boxes)
+        total_cand += len(boxes)
+        used = set()
+        for i, ref_box in enumerate(ref_boxes):
+            best, best_iou = None, iou_threshold
+            for j, box in enumerate(boxes):
+                if j in used or cls[j] != ref_cls[i]:
+                    continue
+                iou = _iou(ref_box, box)
+                if iou >= best_iou:
+                    best, best_iou = j, iou
+            if best is not None:
+                used.add(best)
+                matched += 1
+                ious.append(best_iou)
+                conf_deltas.append(abs(conf[best] - ref_conf[i]))
+
+    return {
+        "recallVsReference": round(matched / total_ref, 4) if total_ref else 1.0,
+        "extraBoxes": total_cand - matched,
+        "meanIou": round(float(np.mean(ious)), 4) if ious else None,
+        "meanConfDelta": round(float(np.mean(conf_deltas)), 4) if conf_deltas else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", required=True, help="Directory of sample images")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        help="name[:model_path]; repeatable, first one is the reference",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    specs = args.backend or ["ultralytics:best.pt", "onnxruntime:best.onnx"]
+    image_paths = sorted(
+        os.path.join(args.images, f)
+        for f in os.listdir(args.images)
+        if f.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not image_paths:
+        raise SystemExit(f"No images found in {args.images}")
+
+    context = multiprocessing.get_context("spawn")
+    reports = []
+    for spec in specs:
+        with context.Pool(1) as pool:
+            reports.append(
+                pool.apply(_run_backend, (spec, image_paths, args.runs, args.batch_size))
+            )
+
+    reference = reports[0]["detections"]
+    header = f"{'backend':40} {'load s':>7} {'model MB':>9} {'p50 ms':>8} {'p95 ms':>8}"
+    print(header)
+    print("-" * len(header))
+    for report in reports:
+        print(
+            f"{report['backend']:40} {report['loadSeconds']:>7} "
+            f"{report['modelRssMb']:>9} {report['p50Ms']:>8} {report['p95Ms']:>8}"
+        )
+
+    print(f"\nAccuracy drift vs {reports[0]['backend']}:")
+    for report in reports[1:]:
+        print(f"  {report['backend']}: {accuracy_drift(reference, report['detections'])}")
+
+
+if __name__ == "__main__":
+    main()
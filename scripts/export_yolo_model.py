@@ -0,0 +1,34 @@
+"""
+Export best.pt for the CPU inference backends.
+
+Usage:
+    python -m scripts.export_yolo_model --format onnx
+    python -m scripts.export_yolo_model --format onnx --int8
+    python -m scripts.export_yolo_model --format openvino --int8 --data data.yaml
+
+Then point YOLO_BACKEND / YOLO_ONNX_PATH / YOLO_OPENVINO_PATH at the output.
+"""
+
+import argparse
+
+from app.services.inference_backends import YOLO_MODEL_PATH, export_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--format", choices=["onnx", "openvino"], default="onnx")
+    parser.add_argument("--int8", action="store_true", help="Quantize to INT8")
+    parser.add_argument("--model", default=YOLO_MODEL_PATH)
+    parser.add_argument(
+        "--data", default=None, help="Calibration dataset yaml for OpenVINO INT8"
+    )
+    args = parser.parse_args()
+
+    exported = export_model(
+        export_format=args.format, int8=args.int8, model_path=args.model, data=args.data
+    )
+    print(f"Exported {args.model} -> {exported}")
+
+
+if __name__ == "__main__":
+    main()
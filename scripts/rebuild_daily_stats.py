@@ -0,0 +1,34 @@
+"""
+Recompute daily_inventory_stats from userProducts, e.g. after a bulk import or
+if the incrementally maintained aggregates ever drift.
+
+Usage:
+    python -m scripts.rebuild_daily_stats [--user USER_ID]
+"""
+
+import argparse
+import time
+
+from app.db.session import SessionLocal
+from app.services.daily_stats_service import rebuild_daily_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user", help="Only rebuild this userId's rows")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = rebuild_daily_stats(db, args.user)
+        print(
+            f"Rebuilt daily_inventory_stats: {rows} rows "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()